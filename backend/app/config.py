@@ -3,7 +3,7 @@ Application configuration using Pydantic Settings.
 Loads environment variables with validation.
 """
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 import os
 
 
@@ -12,23 +12,65 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5  # Persistent pool connections (0 disables local pooling)
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed under load
+    DB_POOL_TIMEOUT: float = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 3600  # Recycle connections after this many seconds
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "always"  # When to ping connections on checkout
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30  # With "idle": ping connections idle this long
+    DB_WARMUP_CONNECTIONS: int = 2  # Pool connections opened and warmed at startup (per pool)
+    WARMUP_TIMEOUT_SECONDS: float = 10  # Limit on all database warm-up steps; startup continues after it
+    DB_PGBOUNCER_MODE: bool = False  # Disable prepared statement caches (PgBouncer / Supabase transaction pooler)
+    DATABASE_REPLICA_URLS: Optional[str] = None  # Comma-separated read replica URLs
+    DB_ECHO: bool = False  # Log every SQL statement (through the logging queue)
+    QUERY_REPEAT_WARN_THRESHOLD: int = 5  # Warn when a request repeats one statement this often (N+1)
+    QUERY_METRICS_HEADERS: Optional[bool] = None  # X-DB-* response headers (default: on in development)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = 10  # Background database probe interval for readiness
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = 2  # Probe slower than this counts as unreachable
+    METRICS_TOKEN: Optional[str] = None  # Bearer token required by GET /metrics (open when unset)
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5  # Stack sampling interval for profiled requests
+    PROFILE_RING_SIZE: int = 20  # Request profiles kept per instance
     
     # Stripe
     STRIPE_SECRET_KEY: str
     STRIPE_PUBLISHABLE_KEY: str
     STRIPE_WEBHOOK_SECRET: str
+    STRIPE_API_BASE: Optional[str] = None  # Override the Stripe API URL (load tests point it at a fake)
     
     # App Configuration
     FRONTEND_URL: str = "http://localhost:5173"
     ENVIRONMENT: str = "development"
     PORT: int = 8080
     
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Optional[str] = None  # "json" or "text" (default: text in development, json elsewhere)
+    LOG_QUEUE_SIZE: int = 10000  # Records buffered for the log writer thread; overflow is dropped
+    # Fraction of records below WARNING kept per logger (prefix), e.g. "app.services.websocket_manager=0.1"
+    LOG_SAMPLE_RATES: Optional[str] = "app.services.websocket_manager=0.1,app.services.broadcast_backend=0.1"
+    
     # Admin
     ADMIN_PASSWORD: str = "admin123"  # Change this in production!
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production"  # Change this in production!
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRATION_HOURS: int = 24  # Token expires after 24 hours
     
+    # WebSocket
+    WS_SEND_QUEUE_SIZE: int = 100  # Per-connection queued messages before a slow consumer is evicted
+    WS_REPLAY_BUFFER_SIZE: int = 500  # Recent events kept for replay to reconnecting clients
+    WS_PING_INTERVAL_SECONDS: float = 20  # Ping connections quiet for this long (0 disables heartbeats)
+    WS_IDLE_TIMEOUT_SECONDS: float = 60  # Disconnect peers silent for this long
+    BROADCAST_BACKEND: str = "local"  # "local" (single instance) or "postgres" (LISTEN/NOTIFY across instances)
+    BROADCAST_CHANNEL: str = "order_events"  # Postgres NOTIFY channel
+    BROADCAST_DATABASE_URL: Optional[str] = None  # LISTEN connection (session pooler or direct); defaults to DATABASE_URL
+    
+    # Order lookup cache (customer confirmation page)
+    ORDER_CACHE_SIZE: int = 1000  # Orders kept in memory per instance (0 disables the cache)
+    ORDER_CACHE_TTL_SECONDS: float = 10  # Upper bound on staleness if an invalidation is missed
+    
+    # Table zones for WebSocket subscriptions, e.g. "bar:1-4;patio:10-20,22"
+    TABLE_ZONES: Optional[str] = None
+    
     # CORS (comma-separated string from env, or default list)
     CORS_ORIGINS: Optional[str] = None
     
@@ -39,6 +81,55 @@ class Settings(BaseSettings):
             return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
         return [self.FRONTEND_URL, "http://localhost:3000"]
     
+    @property
+    def query_metrics_headers(self) -> bool:
+        """Whether to add per-request X-DB-* headers to responses."""
+        if self.QUERY_METRICS_HEADERS is None:
+            return self.ENVIRONMENT == "development"
+        return self.QUERY_METRICS_HEADERS
+    
+    @property
+    def log_format(self) -> str:
+        """Log output format."""
+        if self.LOG_FORMAT:
+            return self.LOG_FORMAT
+        return "text" if self.ENVIRONMENT == "development" else "json"
+    
+    @property
+    def log_sample_rates(self) -> dict[str, float]:
+        """Parse LOG_SAMPLE_RATES into {logger prefix: rate}."""
+        rates = {}
+        if self.LOG_SAMPLE_RATES:
+            for entry in self.LOG_SAMPLE_RATES.split(","):
+                name, _, rate = entry.partition("=")
+                if name.strip() and rate.strip():
+                    rates[name.strip()] = float(rate)
+        return rates
+    
+    @property
+    def database_replica_urls(self) -> list[str]:
+        """Parse DATABASE_REPLICA_URLS into a list of URLs."""
+        if self.DATABASE_REPLICA_URLS:
+            return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        return []
+    
+    @property
+    def table_zones(self) -> dict[str, set[int]]:
+        """Parse TABLE_ZONES into {zone: table numbers}."""
+        zones = {}
+        if self.TABLE_ZONES:
+            for entry in self.TABLE_ZONES.split(";"):
+                name, _, tables = entry.partition(":")
+                numbers = set()
+                for part in tables.split(","):
+                    start, _, end = part.strip().partition("-")
+                    if end:
+                        numbers.update(range(int(start), int(end) + 1))
+                    elif start:
+                        numbers.add(int(start))
+                zones[name.strip()] = numbers
+        return zones
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,9 +1,24 @@
 """
 Async SQLAlchemy database setup.
 Uses asyncpg driver for PostgreSQL async operations.
+
+Pool size, overflow, timeout and pre-ping strategy come from Settings.
+Each engine's pool records its own checkout latency and waiters, labelled with
+the engine's role ("primary", "replica-0", ...), so pool_stats() can report them.
+
+Write routes use get_db (one transaction on the primary, committed at the end).
+Read routes use get_read_db, which runs in autocommit mode, never flushes or
+commits, and is served by a read replica when DATABASE_REPLICA_URLS is set.
 """
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
+from collections import deque
+from contextlib import asynccontextmanager
+from itertools import cycle
+from uuid import uuid4
+import time
+from sqlalchemy import Engine, TextClause, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from app.config import settings
 
 # Create async engine with SSL for Supabase
@@ -11,27 +26,203 @@ from app.config import settings
 # For asyncpg, we need to pass ssl parameter in the connection string or connect_args
 import ssl
 
-# Configure SSL for Supabase connections
-connect_args = {}
-if "supabase.co" in settings.DATABASE_URL or "pooler.supabase.com" in settings.DATABASE_URL:
-    # Create a permissive SSL context for Supabase pooler
-    # Disable certificate verification to handle self-signed certificates
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-    # For asyncpg, we need to pass the SSL context
-    connect_args = {
-        "ssl": ssl_context
+
+def _connect_args_for(url: str) -> dict:
+    """asyncpg connect arguments for a database URL."""
+    # Configure SSL for Supabase connections
+    args = {}
+    if "supabase.co" in url or "pooler.supabase.com" in url:
+        # Create a permissive SSL context for Supabase pooler
+        # Disable certificate verification to handle self-signed certificates
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+        # For asyncpg, we need to pass the SSL context
+        args = {
+            "ssl": ssl_context
+        }
+
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer / Supabase transaction pooler: a server connection can change
+        # between statements, so neither asyncpg nor SQLAlchemy may cache prepared
+        # statements, and statement names must be unique across clients.
+        args = {
+            **args,
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return args
+
+
+connect_args = _connect_args_for(settings.DATABASE_URL)
+
+
+class PoolMetrics:
+    """Checkout counters of one engine's pool."""
+
+    def __init__(self, role: str = "primary", sample_size: int = 1000):
+        self.role = role
+        self.waiting = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.ping_failures = 0
+        self.total_checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.recent_checkout_seconds: deque[float] = deque(maxlen=sample_size)
+
+    def record_checkout(self, seconds: float):
+        self.checkouts += 1
+        self.total_checkout_seconds += seconds
+        self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+        self.recent_checkout_seconds.append(seconds)
+
+    def stats(self) -> dict:
+        recent = sorted(self.recent_checkout_seconds)
+        return {
+            "role": self.role,
+            "waiting": self.waiting,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "ping_failures": self.ping_failures,
+            "checkout_ms": {
+                "avg": round(1000 * self.total_checkout_seconds / self.checkouts, 3)
+                if self.checkouts else 0,
+                "p50": round(1000 * recent[len(recent) // 2], 3) if recent else 0,
+                "p95": round(1000 * recent[int(len(recent) * 0.95)], 3) if recent else 0,
+                "max": round(1000 * self.max_checkout_seconds, 3),
+            },
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Times every checkout (queue wait, connect and pre-ping) and counts waiters in `metrics`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        self.metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.record_checkout(time.perf_counter() - started)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    pass
+
+
+pool_options = {}
+if settings.DB_POOL_SIZE > 0:
+    pool_options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
     }
+else:
+    # No local pool: every session opens a fresh connection (e.g. behind PgBouncer)
+    pool_options = {"poolclass": InstrumentedNullPool}
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.ENVIRONMENT == "development",
-    future=True,
-    connect_args=connect_args,
-    pool_pre_ping=True,  # Verify connections before using them
-    pool_recycle=3600,   # Recycle connections after 1 hour
-)
+
+def _create_engine(url: str, role: str) -> AsyncEngine:
+    """Engine with the configured pool, SSL and pre-ping strategy; `role` labels its pool metrics."""
+    new_engine = create_async_engine(
+        url,
+        # SQL logging goes through the logging queue instead (DB_ECHO)
+        echo=False,
+        future=True,
+        connect_args=_connect_args_for(url),
+        # "always" pings on every checkout; "idle" only pings connections that sat
+        # idle for DB_POOL_PRE_PING_IDLE_SECONDS; "never" skips the round-trip
+        pool_pre_ping=settings.DB_POOL_PRE_PING == "always",
+        **pool_options,
+    )
+    new_engine.pool.metrics.role = role
+
+    if settings.DB_POOL_PRE_PING == "idle":
+        _ping_idle_connections(new_engine.sync_engine)
+
+    return new_engine
+
+
+def _ping_idle_connections(sync_engine: Engine):
+    """Ping connections on checkout only if they sat idle for DB_POOL_PRE_PING_IDLE_SECONDS."""
+    @event.listens_for(sync_engine, "checkin")
+    def _record_checkin_time(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_POOL_PRE_PING_IDLE_SECONDS:
+            return
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            sync_engine.pool.metrics.ping_failures += 1
+            # Tells the pool to discard this connection and retry with a fresh one
+            raise exc.DisconnectionError("Idle connection failed pre-ping")
+
+
+# Primary: all writes, and reads that must see the caller's own writes
+engine = _create_engine(settings.DATABASE_URL, "primary")
+
+# Optional read replicas (DATABASE_REPLICA_URLS); reads fall back to the primary
+replica_engines = [
+    _create_engine(url, f"replica-{index}") for index, url in enumerate(settings.database_replica_urls)
+]
+
+
+def _pool_usage(pool) -> dict:
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "in_use": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+def pool_stats() -> dict:
+    """Current usage and checkout latency of the primary pool, and of each replica pool under "replicas"."""
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pre_ping": settings.DB_POOL_PRE_PING,
+        "pgbouncer_mode": settings.DB_PGBOUNCER_MODE,
+        **pool.metrics.stats(),
+    }
+    stats["sessions"] = {
+        "read": session_metrics.read_sessions,
+        "write": session_metrics.write_sessions,
+        "round_trips_saved": session_metrics.round_trips_saved,
+    }
+    stats.update(_pool_usage(pool))
+    stats["replicas"] = [
+        {**replica.pool.metrics.stats(), **_pool_usage(replica.pool)} for replica in replica_engines
+    ]
+    return stats
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -42,6 +233,72 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+
+
+class ReadOnlySession(Session):
+    """
+    Session for read routes. Flushing and executing anything but a SELECT
+    (update(), insert(), delete(), text("UPDATE ...")) are errors: the session
+    runs in AUTOCOMMIT, so a write would otherwise be committed immediately.
+    """
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_read_only_flush(session, flush_context, instances):
+    raise exc.InvalidRequestError("Cannot write through a read-only session; use get_db")
+
+
+@event.listens_for(ReadOnlySession, "do_orm_execute")
+def _reject_read_only_execute(orm_execute_state):
+    if orm_execute_state.is_select:
+        return
+    # Textual SQL is never flagged as a SELECT; allow it only when it starts with one
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause) and statement.text.lstrip().upper().startswith("SELECT"):
+        return
+    raise exc.InvalidRequestError("Cannot write through a read-only session; use get_db")
+
+
+class SessionMetrics:
+    """Counters for read-only sessions and the round-trips they avoid."""
+
+    def __init__(self):
+        self.read_sessions = 0
+        self.write_sessions = 0
+        self.round_trips_saved = 0
+
+
+session_metrics = SessionMetrics()
+
+# AUTOCOMMIT sends each SELECT on its own, so a read request pays for neither
+# BEGIN nor COMMIT. The isolation level is reset when a connection is returned
+# to its pool. The bind (primary or a replica) is chosen per session by read_session().
+ReadOnlySessionLocal = async_sessionmaker(
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+)
+
+_primary_read_engine = engine.execution_options(isolation_level="AUTOCOMMIT")
+_replica_read_engines = cycle([
+    replica.execution_options(isolation_level="AUTOCOMMIT") for replica in replica_engines
+])
+
+
+def read_session(primary: bool = False) -> AsyncSession:
+    """
+    Read-only session on the next replica (round-robin).
+
+    Args:
+        primary: Read from the primary instead, for reads that must see a
+            write that just happened (replicas may lag behind).
+    """
+    if primary or not replica_engines:
+        return ReadOnlySessionLocal(bind=_primary_read_engine)
+    return ReadOnlySessionLocal(bind=next(_replica_read_engines))
+
+
 # Base class for models
 Base = declarative_base()
 
@@ -51,6 +308,7 @@ async def get_db() -> AsyncSession:
     Dependency for FastAPI routes to get database session.
     Yields a session and ensures it's closed after use.
     """
+    session_metrics.write_sessions += 1
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -60,3 +318,35 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+@asynccontextmanager
+async def _read_scope(primary: bool):
+    # Local import: app.services imports the models, which import this module
+    from app.services.query_metrics import record_round_trips_saved
+
+    session_metrics.read_sessions += 1
+    async with read_session(primary) as session:
+        try:
+            yield session
+        finally:
+            if session.in_transaction():
+                session_metrics.round_trips_saved += 2
+                record_round_trips_saved(2)
+            await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency for read-only routes, served by a replica when configured.
+    Statements run in autocommit mode and the session is never committed,
+    saving the BEGIN and COMMIT round-trips that get_db spends per request.
+    """
+    async with _read_scope(primary=False) as session:
+        yield session
+
+
+async def get_primary_read_db() -> AsyncSession:
+    """Like get_read_db, but always reads from the primary (read-your-writes)."""
+    async with _read_scope(primary=True) as session:
+        yield session
@@ -0,0 +1 @@
+"""Maintenance jobs package (run with `python -m app.jobs.<job>`)."""
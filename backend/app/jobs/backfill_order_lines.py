@@ -0,0 +1,104 @@
+"""
+Backfill job for the normalized order_lines table.
+Unnests Order.items (JSONB) for orders that have no order_lines yet.
+
+Usage (from the backend directory):
+    python -m app.jobs.backfill_order_lines [--batch-size 500]
+
+Safe to re-run: orders that already have lines are skipped.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+from sqlalchemy import text
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Orders are processed in keyset-paginated batches ordered by (created_at, id)
+# so each batch is one short transaction and the job can be interrupted safely.
+SELECT_BATCH_SQL = text("""
+    SELECT o.id, o.created_at
+    FROM orders o
+    WHERE (o.created_at, o.id) > (:after_created_at, :after_id)
+      AND NOT EXISTS (SELECT 1 FROM order_lines l WHERE l.order_id = o.id)
+    ORDER BY o.created_at, o.id
+    LIMIT :batch_size
+""")
+
+INSERT_LINES_SQL = text("""
+    INSERT INTO order_lines
+        (order_id, menu_item_id, category_id, item_name, unit_price, quantity, subtotal, created_at)
+    SELECT o.id,
+           (elem->>'item_id')::int,
+           mi.category_id,
+           elem->>'name',
+           (elem->>'price')::numeric(10, 2),
+           (elem->>'quantity')::int,
+           (elem->>'subtotal')::numeric(10, 2),
+           o.created_at
+    FROM orders o
+    CROSS JOIN LATERAL jsonb_array_elements(o.items) AS elem
+    LEFT JOIN menu_items mi ON mi.id = (elem->>'item_id')::int
+    WHERE o.id = ANY(:order_ids)
+""")
+
+
+async def backfill_order_lines(batch_size: int = 500) -> int:
+    """
+    Create order_lines rows for every order that has none.
+    
+    Args:
+        batch_size: Number of orders per transaction
+        
+    Returns:
+        Number of orders backfilled
+    """
+    after_created_at = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    after_id = UUID(int=0)
+    total_orders = 0
+    
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                SELECT_BATCH_SQL,
+                {
+                    "after_created_at": after_created_at,
+                    "after_id": after_id,
+                    "batch_size": batch_size,
+                },
+            )
+            batch = result.all()
+            if not batch:
+                break
+            
+            order_ids = [row.id for row in batch]
+            lines_result = await conn.execute(INSERT_LINES_SQL, {"order_ids": order_ids})
+            
+        after_created_at, after_id = batch[-1].created_at, batch[-1].id
+        total_orders += len(batch)
+        logger.info(f"Backfilled {lines_result.rowcount} lines for {len(batch)} orders ({total_orders} total)")
+    
+    return total_orders
+
+
+async def main(batch_size: int) -> None:
+    try:
+        total = await backfill_order_lines(batch_size=batch_size)
+        logger.info(f"Order lines backfill complete: {total} orders processed")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill order_lines from orders.items")
+    parser.add_argument("--batch-size", type=int, default=500, help="Orders per transaction")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,73 @@
+"""
+Backfill job for the denormalized orders.table_number column.
+Copies tables.table_number onto orders created before migration 002.
+
+Usage (from the backend directory):
+    python -m app.jobs.backfill_order_table_numbers [--batch-size 1000]
+
+Safe to re-run: only orders with a NULL table_number are updated.
+"""
+import argparse
+import asyncio
+import logging
+from sqlalchemy import text
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Each batch is one short transaction, so the job can be interrupted safely
+# and never holds row locks on many orders at once.
+UPDATE_BATCH_SQL = text("""
+    UPDATE orders o
+    SET table_number = t.table_number
+    FROM tables t
+    WHERE t.id = o.table_id
+      AND o.id IN (
+          SELECT id FROM orders
+          WHERE table_number IS NULL
+          LIMIT :batch_size
+      )
+""")
+
+
+async def backfill_order_table_numbers(batch_size: int = 1000) -> int:
+    """
+    Set table_number on every order that has none.
+    
+    Args:
+        batch_size: Number of orders per transaction
+        
+    Returns:
+        Number of orders backfilled
+    """
+    total_orders = 0
+    
+    while True:
+        async with engine.begin() as conn:
+            result = await conn.execute(UPDATE_BATCH_SQL, {"batch_size": batch_size})
+        if not result.rowcount:
+            break
+        total_orders += result.rowcount
+        logger.info(f"Backfilled table_number for {result.rowcount} orders ({total_orders} total)")
+    
+    return total_orders
+
+
+async def main(batch_size: int) -> None:
+    try:
+        total = await backfill_order_table_numbers(batch_size=batch_size)
+        logger.info(f"Order table_number backfill complete: {total} orders processed")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill orders.table_number from tables")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Orders per transaction")
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    asyncio.run(main(args.batch_size))
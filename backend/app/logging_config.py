@@ -0,0 +1,181 @@
+"""
+Non-blocking logging with request correlation ids.
+
+Loggers only put records on a bounded in-memory queue; a background thread
+(QueueListener) formats them and writes to stdout, so a slow log sink never
+blocks the event loop. When the queue is full, records are dropped and
+counted instead of waiting.
+
+Records are JSON lines (Cloud Logging reads `severity`, `message` and
+`time`) or plain text in development. Each carries the id of the request it
+was logged from. Noisy loggers can be sampled per logger with
+LOG_SAMPLE_RATES; warnings and errors are never sampled out.
+"""
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from uuid import uuid4
+import atexit
+import logging
+import queue
+import random
+import sys
+import orjson
+from app.config import settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+# Loggers that install their own synchronous handlers; routed through the queue instead
+REROUTED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below WARNING from loggers with a sample rate (longest prefix wins)."""
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._cache: dict[str, Optional[float]] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        if name not in self._cache:
+            matches = [prefix for prefix in self.rates if name == prefix or name.startswith(prefix + ".")]
+            self._cache[name] = self.rates[max(matches, key=len)] if matches else None
+        return self._cache[name]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+
+class ContextQueueHandler(QueueHandler):
+    """Enqueue records without blocking, stamped with the current request id."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve everything that depends on the caller's context or live objects now
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "request_id", None) is None:
+            record.request_id = "-"
+        return super().format(record)
+
+
+_queue_handler: Optional[ContextQueueHandler] = None
+
+
+def setup_logging():
+    """Route the root logger (and uvicorn's loggers) through the queue. Safe to call twice."""
+    global _queue_handler
+    if _queue_handler is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler = ContextQueueHandler(log_queue)
+    if settings.log_sample_rates:
+        _queue_handler.addFilter(SamplingFilter(settings.log_sample_rates))
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if settings.log_format == "json" else TextFormatter())
+    listener = QueueListener(log_queue, output)
+    listener.start()
+    # Flush what is still queued on interpreter exit
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name in REROUTED_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+    if settings.DB_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+
+def dropped_records() -> int:
+    """Records dropped because the log queue was full."""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware giving each request a correlation id for its log records.
+    Uses the caller's X-Request-ID, else the Cloud Run trace id, else a new
+    one, and returns it in the X-Request-ID response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+            if name == b"x-cloud-trace-context" and request_id is None:
+                request_id = value.decode("latin-1").split("/", 1)[0][:64]
+        request_id = request_id or uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
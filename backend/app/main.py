@@ -1,26 +1,57 @@
 """
 FastAPI application entry point.
-Sets up CORS, routes, and startup/shutdown events.
+Sets up CORS, routes, and the startup/shutdown lifespan.
 """
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from typing import Optional
 import logging
 from app.config import settings
+from app.logging_config import RequestIdMiddleware, setup_logging
+from app.responses import FastJSONResponse
 from app.routes import api_router
+from app.services.websocket_manager import manager
+from app.services.broadcast_backend import create_broadcast_backend
+from app.services.query_metrics import QueryMetricsMiddleware
+from app.services.profiler import ProfilingMiddleware
+from app.services.metrics import CONTENT_TYPE, MetricsMiddleware, metrics_authorized, render_metrics
+from app.services.warmup import warm_up
+from app.services.health import db_probe, readiness
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (queue-backed, written by a background thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Start cross-instance broadcasting and warm the instance before it takes
+    traffic (the port only opens once this yields); stop broadcasting on shutdown.
+    Background tasks are stopped even if startup fails partway.
+    """
+    await manager.start(create_broadcast_backend())
+    try:
+        await warm_up()
+        await db_probe.start()
+        yield
+    finally:
+        try:
+            await db_probe.stop()
+        finally:
+            await manager.stop()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="QR Restaurant Ordering System",
     description="Multi-table QR-based restaurant ordering system",
     version="1.0.0",
+    # Rendered with orjson; routes returning trusted rows use json_response()
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -32,16 +63,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand request profiling (X-Profile header or per-route sampling)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-request SQL statement counts and timings
+app.add_middleware(QueryMetricsMiddleware)
+
+# Per-route request counts and latency histograms
+app.add_middleware(MetricsMiddleware)
+
+# Request correlation ids for log records (outermost, so every log line gets one)
+app.add_middleware(RequestIdMiddleware)
+
 # Include API routes
 app.include_router(api_router)
 
 
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness: the process is up. Never touches the database."""
     return {"status": "healthy"}
 
 
+@app.get("/api/health/ready")
+async def readiness_check():
+    """Readiness: 503 when this instance cannot serve (database, pool or outbox), from cached probes."""
+    report = readiness()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics for this instance."""
+    if not metrics_authorized(authorization):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
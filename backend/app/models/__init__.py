@@ -3,5 +3,6 @@ from app.models.category import Category
 from app.models.menu_item import MenuItem
 from app.models.table import Table
 from app.models.order import Order
+from app.models.order_line import OrderLine
 
-__all__ = ["Category", "MenuItem", "Table", "Order"]
+__all__ = ["Category", "MenuItem", "Table", "Order", "OrderLine"]
@@ -39,9 +39,15 @@ class Order(Base):
             name="check_order_status"
         ),
     )
+    # Fetch server defaults (created_at) with RETURNING on INSERT, so a new
+    # order can be cached and broadcast without a refresh round-trip
+    __mapper_args__ = {"eager_defaults": True}
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False, index=True)
+    # Copied from the table at creation (table numbers never change) so order
+    # reads and broadcasts need no join; NULL only until backfilled (migration 002)
+    table_number = Column(Integer, nullable=True)
     items = Column(JSONB, nullable=False)  # [{item_id, name, price, quantity, subtotal}]
     total_amount = Column(Numeric(10, 2), nullable=False)
     customer_name = Column(String(200), nullable=True)
@@ -0,0 +1,35 @@
+"""
+Order line model for normalized, item-level order contents.
+Mirrors Order.items (JSONB) one row per item so sales analytics
+can aggregate with plain indexed queries instead of unnesting JSONB.
+"""
+from sqlalchemy import Column, BigInteger, Integer, String, Numeric, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class OrderLine(Base):
+    """Single item line of an order."""
+
+    __tablename__ = "order_lines"
+    __table_args__ = (
+        Index("idx_order_lines_created_at", "created_at"),
+        Index("idx_order_lines_menu_item_created_at", "menu_item_id", "created_at"),
+        Index("idx_order_lines_category_created_at", "category_id", "created_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    order_id = Column(UUID(as_uuid=True), ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
+    # No FK on menu_item_id/category_id: lines must survive menu items being deleted
+    menu_item_id = Column(Integer, nullable=False)
+    category_id = Column(Integer, nullable=True)
+    item_name = Column(String(200), nullable=False)
+    unit_price = Column(Numeric(10, 2), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    subtotal = Column(Numeric(10, 2), nullable=False)
+    # Copied from the parent order so time-bucketed queries need no join
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<OrderLine(id={self.id}, order_id={self.order_id}, menu_item_id={self.menu_item_id}, quantity={self.quantity})>"
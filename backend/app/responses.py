@@ -0,0 +1,38 @@
+"""
+Fast JSON responses.
+
+FastJSONResponse (orjson) is the app-wide default response class. Routes
+that return trusted data (rows straight from the database) can skip
+re-validation entirely by serializing with a precompiled TypeAdapter from
+app.schemas.serializers and returning json_response(...).
+"""
+from decimal import Decimal
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+
+def _default(value: Any):
+    """Types orjson does not serialize natively."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (UUIDs, datetimes and Decimals included)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(serializer: TypeAdapter, content: Any, status_code: int = 200) -> Response:
+    """Serialize trusted `content` with a precompiled TypeAdapter, without validating it."""
+    return Response(
+        content=serializer.dump_json(content),
+        status_code=status_code,
+        media_type="application/json",
+    )
@@ -2,12 +2,16 @@
 Admin API routes for restaurant management.
 Protected with static password authentication.
 """
-from fastapi import APIRouter, Depends, HTTPException, Header, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, HTTPException, Header, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
-from sqlalchemy.orm import selectinload
 from typing import Optional
-from app.database import get_db
+import json
+from app.database import get_db, get_read_db, get_primary_read_db, read_session, pool_stats
+from app.services.query_metrics import query_stats
+from app.services.warmup import startup_timings
+from app.services.profiler import profiler
 from app.models.category import Category
 from app.models.menu_item import MenuItem
 from app.models.table import Table
@@ -21,9 +25,14 @@ from app.schemas.admin import (
     CategoryUpdate,
     TableCreate,
     TableUpdate,
+    ProfilingRouteRate,
 )
 from app.config import settings
-from app.services.websocket_manager import manager
+from app.responses import json_response
+from app.schemas.serializers import admin_orders_serializer
+from app.services.websocket_manager import manager, Subscription
+from app.services.kitchen_queue import kitchen_queue, load_kitchen_queue, sync_kitchen_order
+from app.services.order_service import order_event_data
 from app.services.jwt_service import create_admin_token, verify_admin_token as verify_jwt_token
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -77,7 +86,7 @@ async def admin_logout(token: str = Depends(verify_admin_token)):
 
 @router.get("/categories")
 async def get_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get all categories."""
@@ -152,7 +161,7 @@ async def delete_category(
 
 @router.get("/menu-items")
 async def get_menu_items(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get all menu items."""
@@ -280,189 +289,81 @@ async def delete_menu_item(
 @router.get("/orders")
 async def get_orders(
     limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get recent orders."""
+    return json_response(admin_orders_serializer, await _recent_orders(db, limit))
+
+
+async def _recent_orders(db: AsyncSession, limit: int) -> list[dict]:
+    """Newest orders as dicts (shared by GET /orders and WebSocket snapshots)."""
     result = await db.execute(
         select(Order)
-        .options(selectinload(Order.table))  # Eagerly load table relationship
         .order_by(Order.created_at.desc())
         .limit(limit)
     )
     orders = result.scalars().all()
     
-    return [
-        {
-            "id": str(order.id),
-            "table_number": order.table.table_number,
-            "items": order.items,
-            "total_amount": float(order.total_amount),
-            "customer_name": order.customer_name,
-            "special_instructions": order.special_instructions,
-            "payment_status": order.payment_status,
-            "order_status": getattr(order, 'order_status', 'pending'),
-            "created_at": order.created_at.isoformat(),
-        }
-        for order in orders
-    ]
+    return [order_event_data(order) for order in orders]
+
+
+@router.get("/kitchen")
+async def get_kitchen_queue(
+    token: str = Depends(verify_admin_token),
+):
+    """
+    Get active (pending and accepted) orders for the kitchen display.
+    Served from the in-memory kitchen queue, grouped by table and ordered by age.
+    Screens apply `kitchen_update` deltas from the orders WebSocket on top of this
+    snapshot. Versions are counted per instance: when a delta's stream_id matches
+    the snapshot's, refetch if its version is not exactly version + 1. Deltas with
+    another stream_id (WebSocket served by another instance) are applied as-is.
+    """
+    if not kitchen_queue.loaded:
+        try:
+            await load_kitchen_queue()
+        except Exception as e:
+            raise HTTPException(status_code=503, detail=f"Kitchen queue unavailable: {str(e)}")
+    
+    return kitchen_queue.snapshot()
 
 
 # ==================== Analytics ====================
 
 @router.get("/analytics")
 async def get_analytics(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get analytics data for dashboard."""
-    from datetime import datetime, timedelta, timezone
-    from sqlalchemy import func, and_
-    
-    # Get current date boundaries
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = today_start - timedelta(days=now.weekday())  # Start of week (Monday)
-    
-    # Get all orders
-    all_orders_result = await db.execute(select(Order))
-    all_orders = all_orders_result.scalars().all()
-    
-    # Calculate sales today (only paid orders)
-    today_sales_result = await db.execute(
-        select(func.sum(Order.total_amount))
-        .where(
-            and_(
-                Order.created_at >= today_start,
-                Order.payment_status == 'paid'
-            )
-        )
-    )
-    sales_today = float(today_sales_result.scalar() or 0)
-    
-    # Calculate sales this week (only paid orders)
-    week_sales_result = await db.execute(
-        select(func.sum(Order.total_amount))
-        .where(
-            and_(
-                Order.created_at >= week_start,
-                Order.payment_status == 'paid'
-            )
-        )
-    )
-    sales_this_week = float(week_sales_result.scalar() or 0)
-    
-    # Calculate total sales (all time, only paid orders)
-    total_sales_result = await db.execute(
-        select(func.sum(Order.total_amount))
-        .where(Order.payment_status == 'paid')
-    )
-    total_sales = float(total_sales_result.scalar() or 0)
+    from app.services import analytics
     
-    # Count orders today
-    today_orders_result = await db.execute(
-        select(func.count(Order.id))
-        .where(Order.created_at >= today_start)
-    )
-    orders_today = today_orders_result.scalar() or 0
-    
-    # Count orders this week
-    week_orders_result = await db.execute(
-        select(func.count(Order.id))
-        .where(Order.created_at >= week_start)
-    )
-    orders_this_week = week_orders_result.scalar() or 0
-    
-    # Total orders count
-    total_orders = len(all_orders)
-    
-    # Average order value (only paid orders)
-    paid_orders = [o for o in all_orders if o.payment_status == 'paid']
-    avg_order_value = float(sum(float(o.total_amount) for o in paid_orders) / len(paid_orders)) if paid_orders else 0
-    
-    # Orders by status
-    orders_by_status = {}
-    for order in all_orders:
-        status = getattr(order, 'order_status', 'pending')
-        orders_by_status[status] = orders_by_status.get(status, 0) + 1
-    
-    # Orders by payment status
-    orders_by_payment = {}
-    for order in all_orders:
-        payment_status = order.payment_status
-        orders_by_payment[payment_status] = orders_by_payment.get(payment_status, 0) + 1
-    
-    # Daily sales for the last 7 days
-    daily_sales = []
-    for i in range(6, -1, -1):  # Last 7 days including today
-        day_start = today_start - timedelta(days=i)
-        day_end = day_start + timedelta(days=1)
-        
-        day_sales_result = await db.execute(
-            select(func.sum(Order.total_amount))
-            .where(
-                and_(
-                    Order.created_at >= day_start,
-                    Order.created_at < day_end,
-                    Order.payment_status == 'paid'
-                )
-            )
-        )
-        day_sales = float(day_sales_result.scalar() or 0)
-        
-        daily_sales.append({
-            "date": day_start.strftime("%Y-%m-%d"),
-            "day": day_start.strftime("%a"),  # Day name (Mon, Tue, etc.)
-            "sales": day_sales
-        })
-    
-    # Daily orders for the last 7 days
-    daily_orders = []
-    for i in range(6, -1, -1):
-        day_start = today_start - timedelta(days=i)
-        day_end = day_start + timedelta(days=1)
-        
-        day_orders_result = await db.execute(
-            select(func.count(Order.id))
-            .where(
-                and_(
-                    Order.created_at >= day_start,
-                    Order.created_at < day_end
-                )
-            )
-        )
-        day_orders = day_orders_result.scalar() or 0
-        
-        daily_orders.append({
-            "date": day_start.strftime("%Y-%m-%d"),
-            "day": day_start.strftime("%a"),
-            "orders": day_orders
-        })
+    return await analytics.dashboard_analytics(db)
+
+
+@router.get("/analytics/items")
+async def get_item_analytics(
+    days: int = Query(7, ge=1, le=366, description="Look-back window in days"),
+    limit: int = Query(10, ge=1, le=100, description="Max items returned"),
+    paid_only: bool = Query(True, description="Only count paid orders"),
+    db: AsyncSession = Depends(get_read_db),
+    token: str = Depends(verify_admin_token),
+):
+    """
+    Item-level sales analytics from the normalized order_lines table.
+    Returns top items, per-category totals and per-hour-of-day totals (UTC).
+    """
+    from app.services import analytics
     
-    return {
-        "sales": {
-            "today": sales_today,
-            "this_week": sales_this_week,
-            "total": total_sales
-        },
-        "orders": {
-            "today": orders_today,
-            "this_week": orders_this_week,
-            "total": total_orders
-        },
-        "average_order_value": avg_order_value,
-        "orders_by_status": orders_by_status,
-        "orders_by_payment_status": orders_by_payment,
-        "daily_sales": daily_sales,
-        "daily_orders": daily_orders
-    }
+    return await analytics.item_analytics(db, days=days, limit=limit, paid_only=paid_only)
 
 
 # ==================== Tables Management ====================
 
 @router.get("/tables")
 async def get_tables(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get all tables."""
@@ -574,7 +475,7 @@ async def delete_table(
 
 @router.get("/qr-codes")
 async def get_qr_code_info(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
     token: str = Depends(verify_admin_token),
 ):
     """Get QR code URLs for all active tables."""
@@ -611,11 +512,7 @@ async def accept_order(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid order ID format")
     
-    result = await db.execute(
-        select(Order)
-        .options(selectinload(Order.table))
-        .where(Order.id == order_uuid)
-    )
+    result = await db.execute(select(Order).where(Order.id == order_uuid))
     order = result.scalar_one_or_none()
     
     if not order:
@@ -626,24 +523,22 @@ async def accept_order(
     await db.commit()
     await db.refresh(order)
     
+    order_data = order_event_data(order)
+    
     # Broadcast status update
     try:
-        order_data = {
-            "id": str(order.id),
-            "table_number": order.table.table_number,
-            "items": order.items,
-            "total_amount": float(order.total_amount),
-            "customer_name": order.customer_name,
-            "special_instructions": order.special_instructions,
-            "payment_status": order.payment_status,
-            "order_status": order.order_status,
-            "created_at": order.created_at.isoformat(),
-        }
         await manager.broadcast_order_status_update(str(order.id), order.order_status, order_data)
     except Exception as e:
         import logging
         logging.error(f"Failed to broadcast order status update: {e}")
     
+    # Update the kitchen queue even if the broadcast failed
+    try:
+        await sync_kitchen_order(order_data)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to update kitchen queue: {e}")
+    
     return {
         "id": str(order.id),
         "order_status": order.order_status,
@@ -664,11 +559,7 @@ async def reject_order(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid order ID format")
     
-    result = await db.execute(
-        select(Order)
-        .options(selectinload(Order.table))
-        .where(Order.id == order_uuid)
-    )
+    result = await db.execute(select(Order).where(Order.id == order_uuid))
     order = result.scalar_one_or_none()
     
     if not order:
@@ -679,24 +570,22 @@ async def reject_order(
     await db.commit()
     await db.refresh(order)
     
+    order_data = order_event_data(order)
+    
     # Broadcast status update
     try:
-        order_data = {
-            "id": str(order.id),
-            "table_number": order.table.table_number,
-            "items": order.items,
-            "total_amount": float(order.total_amount),
-            "customer_name": order.customer_name,
-            "special_instructions": order.special_instructions,
-            "payment_status": order.payment_status,
-            "order_status": order.order_status,
-            "created_at": order.created_at.isoformat(),
-        }
         await manager.broadcast_order_status_update(str(order.id), order.order_status, order_data)
     except Exception as e:
         import logging
         logging.error(f"Failed to broadcast order status update: {e}")
     
+    # Update the kitchen queue even if the broadcast failed
+    try:
+        await sync_kitchen_order(order_data)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to update kitchen queue: {e}")
+    
     return {
         "id": str(order.id),
         "order_status": order.order_status,
@@ -717,11 +606,7 @@ async def complete_order(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid order ID format")
     
-    result = await db.execute(
-        select(Order)
-        .options(selectinload(Order.table))
-        .where(Order.id == order_uuid)
-    )
+    result = await db.execute(select(Order).where(Order.id == order_uuid))
     order = result.scalar_one_or_none()
     
     if not order:
@@ -739,24 +624,22 @@ async def complete_order(
     await db.commit()
     await db.refresh(order)
     
+    order_data = order_event_data(order)
+    
     # Broadcast status update
     try:
-        order_data = {
-            "id": str(order.id),
-            "table_number": order.table.table_number,
-            "items": order.items,
-            "total_amount": float(order.total_amount),
-            "customer_name": order.customer_name,
-            "special_instructions": order.special_instructions,
-            "payment_status": order.payment_status,
-            "order_status": order.order_status,
-            "created_at": order.created_at.isoformat(),
-        }
         await manager.broadcast_order_status_update(str(order.id), order.order_status, order_data)
     except Exception as e:
         import logging
         logging.error(f"Failed to broadcast order status update: {e}")
     
+    # Update the kitchen queue even if the broadcast failed
+    try:
+        await sync_kitchen_order(order_data)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to update kitchen queue: {e}")
+    
     return {
         "id": str(order.id),
         "order_status": order.order_status,
@@ -764,13 +647,103 @@ async def complete_order(
     }
 
 
+# ==================== Database Pool ====================
+
+@router.get("/db/pool")
+async def get_db_pool_stats(
+    token: str = Depends(verify_admin_token),
+):
+    """Get database connection pool usage and checkout latency for this instance."""
+    return pool_stats()
+
+
+@router.get("/db/queries")
+async def get_db_query_stats(
+    token: str = Depends(verify_admin_token),
+):
+    """Get per-route SQL statement counts, DB time and slowest statements for this instance."""
+    return query_stats()
+
+
+@router.get("/startup")
+async def get_startup_timings(
+    token: str = Depends(verify_admin_token),
+):
+    """Get this instance's cold-start warm-up timings in milliseconds."""
+    return startup_timings
+
+
+# ==================== Request Profiling ====================
+
+@router.get("/profiling")
+async def get_profiling(
+    token: str = Depends(verify_admin_token),
+):
+    """Get profiling settings and the request profiles kept on this instance (newest first)."""
+    return profiler.stats()
+
+
+@router.put("/profiling/routes")
+async def set_profiling_route_rate(
+    body: ProfilingRouteRate,
+    token: str = Depends(verify_admin_token),
+):
+    """Profile a fraction of requests to a route on this instance (rate 0 stops)."""
+    profiler.set_route_rate(body.route, body.rate)
+    return {"route_rates": profiler.route_rates}
+
+
+@router.get("/profiling/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    token: str = Depends(verify_admin_token),
+):
+    """Download a request profile as folded stacks (flamegraph.pl, inferno, speedscope)."""
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile.to_folded(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'},
+    )
+
+
 # ==================== WebSocket for Order Notifications ====================
 
+@router.get("/ws/stats")
+async def get_websocket_stats(
+    token: str = Depends(verify_admin_token),
+):
+    """Get admin WebSocket connection counts, ages and queue depths for this instance."""
+    return manager.stats()
+
+
 @router.websocket("/orders/ws")
 async def websocket_orders(websocket: WebSocket):
     """
     WebSocket endpoint for real-time order notifications.
     Requires admin authentication token as query parameter.
+    
+    Every event carries a `seq`; the first frame is a `hello` with the
+    server's `stream_id`. To resume after a drop, reconnect with the
+    `stream_id` and `last_seq` query parameters: missed events are replayed,
+    or a `snapshot` of recent orders is sent if the gap is no longer buffered.
+    
+    Optional filters (query parameters, or later a JSON message
+    `{"action": "subscribe", "types": [...], "tables": [...], "zones": [...], "status_only": true}`):
+    - `types`: comma-separated event types (new_order, order_status_update, ...)
+    - `tables`: table numbers and ranges, e.g. `1-4,7`
+    - `zones`: zone names from the TABLE_ZONES setting
+    - `status_only`: only order/payment status changes
+    - `batch_ms`: batching window (0-1000 ms); events are then sent as JSON
+      array frames, with superseded status updates for an order collapsed
+    - `encoding`: `json` (default, text frames) or `msgpack` (binary event
+      frames; control frames such as hello/ping stay JSON text)
+    - `diff`: status updates carry only order_id and order_status
+    
+    The server sends `{"type": "ping"}` to quiet connections; any message
+    from the client (e.g. "pong") counts as activity. Connections silent for
+    WS_IDLE_TIMEOUT_SECONDS are closed.
     """
     import logging
     logger = logging.getLogger(__name__)
@@ -793,18 +766,81 @@ async def websocket_orders(websocket: WebSocket):
         await websocket.close(code=1008, reason="Invalid or expired authentication token")
         return
     
+    # Resume position from a previous connection, if any
+    try:
+        last_seq = int(websocket.query_params["last_seq"]) if "last_seq" in websocket.query_params else None
+    except ValueError:
+        last_seq = None
+    stream_id = websocket.query_params.get("stream_id")
+    
+    # Topic filters
+    try:
+        subscription = Subscription.parse(
+            types=websocket.query_params.get("types"),
+            tables=websocket.query_params.get("tables"),
+            zones=websocket.query_params.get("zones"),
+            status_only=websocket.query_params.get("status_only", "").lower() in ("1", "true"),
+            batch_ms=websocket.query_params.get("batch_ms"),
+            encoding=websocket.query_params.get("encoding"),
+            diff=websocket.query_params.get("diff", "").lower() in ("1", "true"),
+        )
+    except ValueError as e:
+        await websocket.close(code=1008, reason=f"Invalid subscription: {e}")
+        return
+    
     # Connect to WebSocket manager
     logger.info(f"WebSocket connection accepted for token: {token[:10]}...")
-    await manager.connect(websocket)
+    up_to_date = await manager.connect(
+        websocket,
+        last_seq=last_seq,
+        stream_id=stream_id,
+        subscription=subscription,
+    )
+    
+    if not up_to_date:
+        # Missed events were evicted from the replay buffer: send current state instead
+        try:
+            async with read_session(primary=True) as db:
+                orders = await _recent_orders(db, 50)
+            if subscription.tables is not None:
+                orders = [o for o in orders if o["table_number"] in subscription.tables]
+            manager.send_to(websocket, json.dumps({"type": "snapshot", "data": {"orders": orders}}))
+        except Exception as e:
+            logger.error(f"Failed to send WebSocket snapshot: {e}")
     
     try:
         # Keep connection alive and listen for messages
         while True:
             # Wait for any message (ping/pong for keepalive)
             data = await websocket.receive_text()
+            manager.touch(websocket)
             # Echo back for keepalive (optional)
             if data == "ping":
-                await websocket.send_text("pong")
+                manager.send_to(websocket, "pong")
+            elif data.startswith("{"):
+                # Subscription change
+                try:
+                    request = json.loads(data)
+                    if request.get("action") == "subscribe":
+                        subscription = Subscription.parse(
+                            types=request.get("types"),
+                            tables=request.get("tables"),
+                            zones=request.get("zones"),
+                            status_only=bool(request.get("status_only")),
+                            batch_ms=request.get("batch_ms"),
+                            encoding=request.get("encoding"),
+                            diff=bool(request.get("diff")),
+                        )
+                        manager.subscribe(websocket, subscription)
+                        manager.send_to(websocket, json.dumps({
+                            "type": "subscribed",
+                            "data": subscription.to_dict()
+                        }))
+                except (ValueError, TypeError, AttributeError) as e:
+                    manager.send_to(websocket, json.dumps({
+                        "type": "error",
+                        "data": {"detail": f"Invalid subscription: {e}"}
+                    }))
     except WebSocketDisconnect:
         manager.disconnect(websocket)
     except Exception as e:
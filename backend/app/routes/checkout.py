@@ -8,9 +8,11 @@ from app.database import get_db
 from app.config import settings
 from app.models.table import Table
 from app.schemas.checkout import CheckoutRequest, CheckoutResponse, OrderCreateRequest, OrderCreateResponse
-from app.services.order_service import OrderService
+from app.services.order_service import OrderService, order_event_data
 from app.services.stripe_service import StripeService
 from app.services.websocket_manager import manager
+from app.services.kitchen_queue import sync_kitchen_order
+from app.services.order_stream import create_order_token
 
 router = APIRouter()
 
@@ -40,6 +42,7 @@ async def create_checkout_session(
         order = await OrderService.create_order(
             db=db,
             table_id=request.table_id,
+            table_number=table_obj.table_number,
             checkout_items=request.items,
             customer_name=request.customer_name,
             special_instructions=request.special_instructions,
@@ -67,7 +70,10 @@ async def create_checkout_session(
         })
     
     # Build URLs
-    success_url = f"{settings.FRONTEND_URL}/order-confirmation?session_id={{CHECKOUT_SESSION_ID}}"
+    success_url = (
+        f"{settings.FRONTEND_URL}/order-confirmation?session_id={{CHECKOUT_SESSION_ID}}"
+        f"&order_id={order.id}&token={create_order_token(str(order.id))}"
+    )
     cancel_url = f"{settings.FRONTEND_URL}/menu?table={request.table_id}&cancelled=true"
     
     # Create Stripe checkout session
@@ -91,27 +97,24 @@ async def create_checkout_session(
     # Update order with Stripe session ID
     order.stripe_session_id = session_data["session_id"]
     await db.commit()
-    await db.refresh(order)
+    OrderService.cache_order(order)
     
     # Broadcast new order to connected admin clients
+    order_data = order_event_data(order)
     try:
-        order_data = {
-            "id": str(order.id),
-            "table_number": table_obj.table_number,
-            "items": order.items,
-            "total_amount": float(order.total_amount),
-            "customer_name": order.customer_name,
-            "special_instructions": order.special_instructions,
-            "payment_status": order.payment_status,
-            "order_status": getattr(order, 'order_status', 'pending'),
-            "created_at": order.created_at.isoformat(),
-        }
         await manager.broadcast_order(order_data)
     except Exception as e:
         # Don't fail the request if WebSocket broadcast fails
         import logging
         logging.error(f"Failed to broadcast order: {e}")
     
+    # Update the kitchen queue even if the broadcast failed
+    try:
+        await sync_kitchen_order(order_data)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to update kitchen queue: {e}")
+    
     return CheckoutResponse(checkout_url=session_data["checkout_url"])
 
 
@@ -141,25 +144,18 @@ async def create_order_without_payment(
         order = await OrderService.create_order(
             db=db,
             table_id=request.table_id,
+            table_number=table_obj.table_number,
             checkout_items=request.items,
             customer_name=request.customer_name,
             special_instructions=request.special_instructions,
         )
         
-        # Get order data before commit (to avoid detached instance issues)
-        order_id = order.id  # Keep as UUID for return
-        order_id_str = str(order.id)  # String version for broadcast
-        order_items = order.items
-        order_total = float(order.total_amount)
-        order_customer_name = order.customer_name
-        order_instructions = order.special_instructions
-        order_status = order.payment_status
-        
         await db.commit()
+        OrderService.cache_order(order)
         
-        # Get created_at after commit by querying if needed, or use current time
-        from datetime import datetime
-        order_created_at = datetime.utcnow().isoformat()
+        # created_at is returned by the INSERT (Order uses eager_defaults), and
+        # sessions do not expire on commit, so the order stays readable
+        order_data = order_event_data(order)
         
     except ValueError as e:
         await db.rollback()
@@ -175,24 +171,21 @@ async def create_order_without_payment(
     
     # Broadcast new order to connected admin clients (don't fail request if this fails)
     try:
-        order_data = {
-            "id": order_id_str,
-            "table_number": table_obj.table_number,
-            "items": order_items,
-            "total_amount": order_total,
-            "customer_name": order_customer_name,
-            "special_instructions": order_instructions,
-            "payment_status": order_status,
-            "order_status": "pending",
-            "created_at": order_created_at,
-        }
         await manager.broadcast_order(order_data)
     except Exception as e:
         # Don't fail the request if WebSocket broadcast fails
         import logging
         logging.error(f"Failed to broadcast order: {e}", exc_info=True)
     
+    # Update the kitchen queue even if the broadcast failed
+    try:
+        await sync_kitchen_order(order_data)
+    except Exception as e:
+        import logging
+        logging.error(f"Failed to update kitchen queue: {e}")
+    
     return OrderCreateResponse(
-        order_id=order_id,
+        order_id=order.id,
+        order_token=create_order_token(order_data["id"]),
         message="Order placed successfully. Payment can be completed later."
     )
@@ -1,82 +1,135 @@
 """
 Orders API routes.
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 from uuid import UUID
-from app.database import get_db
-from app.models.order import Order
+import asyncio
+import json
+from app.database import get_read_db, get_primary_read_db, read_session, replica_engines
+from app.responses import json_response
 from app.schemas.order import OrderResponse
-from app.services.order_service import OrderService
+from app.schemas.serializers import order_serializer
+from app.services import fast_reads
+from app.services.order_cache import order_cache
+from app.services.order_stream import (
+    FINAL_ORDER_STATUSES,
+    order_channels,
+    status_message,
+    verify_order_token,
+)
 
 router = APIRouter()
 
+# Comment line sent on idle status streams so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/orders/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Get order details by ID.
+    Served from the order cache when possible. Otherwise read from a replica;
+    an order created moments ago may not have reached it yet, so a miss is
+    retried on the primary. Only rows read from the primary are cached: a
+    lagging replica can return an old status, which would then be served
+    until the TTL.
     """
-    result = await db.execute(
-        select(Order)
-        .options(selectinload(Order.table))  # Eagerly load table relationship
-        .where(Order.id == order_id)
-    )
-    order = result.scalar_one_or_none()
-    
-    if not order:
-        raise HTTPException(status_code=404, detail="Order not found")
+    order = order_cache.get(order_id)
+    if order is None:
+        generation = order_cache.generation()
+        order = await fast_reads.fetch_order(db, order_id)
+        from_primary = not replica_engines
+        
+        if not order and replica_engines:
+            async with read_session(primary=True) as primary_db:
+                order = await fast_reads.fetch_order(primary_db, order_id)
+            from_primary = True
+        
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        if from_primary:
+            order_cache.put(order, generation=generation)
     
-    # Get table number from relationship
-    table_number = order.table.table_number
-    
-    return OrderResponse(
-        id=order.id,
-        table_number=table_number,
-        items=order.items,
-        total_amount=float(order.total_amount),
-        customer_name=order.customer_name,
-        special_instructions=order.special_instructions,
-        payment_status=order.payment_status,
-        created_at=order.created_at,
-    )
+    return json_response(order_serializer, order)
 
 
 @router.get("/orders/by-session/{session_id}", response_model=OrderResponse)
 async def get_order_by_session(
     session_id: str,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_primary_read_db),
 ):
     """
     Get order details by Stripe session ID.
     Useful for order confirmation page.
+    Served from the order cache when possible, otherwise read from the
+    primary: the Stripe redirect arrives right after the order is created
+    and its payment status updated.
     """
-    # Get order with table relationship loaded
-    result = await db.execute(
-        select(Order)
-        .options(selectinload(Order.table))  # Eagerly load table relationship
-        .where(Order.stripe_session_id == session_id)
-    )
-    order = result.scalar_one_or_none()
+    order = order_cache.get_by_session(session_id)
+    if order is None:
+        generation = order_cache.generation()
+        order = await fast_reads.fetch_order_by_session(db, session_id)
+        
+        if not order:
+            raise HTTPException(status_code=404, detail="Order not found")
+        order_cache.put(order, session_id=session_id, generation=generation)
+    
+    return json_response(order_serializer, order)
+
+
+@router.get("/orders/{order_id}/events")
+async def order_events(
+    order_id: UUID,
+    token: str = Query(..., description="Order token returned when the order was created"),
+):
+    """
+    Stream payment and kitchen status changes of one order (Server-Sent Events).
+    
+    Sends the current status first, then a `status` event on every change,
+    and ends once the order is rejected or completed. Used by the order
+    confirmation page instead of polling the order lookup.
+    """
+    order_id_str = str(order_id)
+    if not verify_order_token(order_id_str, token):
+        raise HTTPException(status_code=403, detail="Invalid order token")
+    
+    # Subscribe before reading the current status so no change slips in between
+    queue = order_channels.subscribe(order_id_str)
+    try:
+        async with read_session(primary=True) as db:
+            order = await fast_reads.fetch_order(db, order_id)
+    except Exception:
+        order_channels.unsubscribe(order_id_str, queue)
+        raise
     
     if not order:
+        order_channels.unsubscribe(order_id_str, queue)
         raise HTTPException(status_code=404, detail="Order not found")
     
-    # Get table number from relationship
-    table_number = order.table.table_number
-    
-    return OrderResponse(
-        id=order.id,
-        table_number=table_number,
-        items=order.items,
-        total_amount=float(order.total_amount),
-        customer_name=order.customer_name,
-        special_instructions=order.special_instructions,
-        payment_status=order.payment_status,
-        created_at=order.created_at,
+    return StreamingResponse(
+        _order_event_stream(order_id_str, order, queue),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+
+async def _order_event_stream(order_id: str, order: dict, queue: asyncio.Queue):
+    """Yield SSE frames for one order until it reaches a final status."""
+    try:
+        current = status_message(order_id, order["payment_status"], order["order_status"])
+        yield f"event: status\ndata: {json.dumps(current)}\n\n"
+        while current["order_status"] not in FINAL_ORDER_STATUSES:
+            try:
+                update = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            current = {**current, **update}
+            yield f"event: status\ndata: {json.dumps(current)}\n\n"
+    finally:
+        order_channels.unsubscribe(order_id, queue)
@@ -8,6 +8,9 @@ from app.database import get_db
 from app.models.order import Order, PaymentStatus
 from app.services.stripe_service import StripeService
 from app.services.order_service import OrderService
+from app.services.kitchen_queue import sync_kitchen_payment_status
+from app.services.metrics import observe_webhook_lag
+from app.services.websocket_manager import manager
 import json
 import logging
 
@@ -37,6 +40,8 @@ async def stripe_webhook(
         logger.error(f"Webhook signature verification failed: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     
+    observe_webhook_lag(event)
+    
     # Handle different event types
     event_type = event["type"]
     event_data = event["data"]["object"]
@@ -68,6 +73,19 @@ async def stripe_webhook(
         await db.commit()
         logger.info(f"Order {order.id} marked as paid")
         
+        try:
+            await manager.broadcast_payment_status_update(
+                str(order.id), PaymentStatus.PAID.value, table_number=order.table_number
+            )
+        except Exception as e:
+            logger.error(f"Failed to broadcast payment status update: {e}")
+        
+        # Update the kitchen queue even if the broadcast failed
+        try:
+            await sync_kitchen_payment_status(str(order.id), PaymentStatus.PAID.value)
+        except Exception as e:
+            logger.error(f"Failed to update kitchen queue: {e}")
+        
     elif event_type == "payment_intent.payment_failed":
         # Payment failed
         payment_intent_id = event_data.get("id")
@@ -90,6 +108,19 @@ async def stripe_webhook(
             )
             await db.commit()
             logger.info(f"Order {order.id} marked as failed")
+            
+            try:
+                await manager.broadcast_payment_status_update(
+                    str(order.id), PaymentStatus.FAILED.value, table_number=order.table_number
+                )
+            except Exception as e:
+                logger.error(f"Failed to broadcast payment status update: {e}")
+            
+            # Update the kitchen queue even if the broadcast failed
+            try:
+                await sync_kitchen_payment_status(str(order.id), PaymentStatus.FAILED.value)
+            except Exception as e:
+                logger.error(f"Failed to update kitchen queue: {e}")
     
     # Return 200 to acknowledge webhook receipt
     return {"status": "ok"}
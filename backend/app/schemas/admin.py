@@ -58,3 +58,11 @@ class TableUpdate(BaseModel):
     """Update table request."""
     is_active: Optional[bool] = None
     qr_code_url: Optional[str] = Field(None, max_length=500)
+
+
+class ProfilingRouteRate(BaseModel):
+    """Sample rate for profiling one route."""
+    route: str = Field(
+        ..., pattern=r"^[A-Z]+ /\S*$", description='Method and full route template, e.g. "GET /api/orders/{order_id}"'
+    )
+    rate: float = Field(..., ge=0, le=1, description="Fraction of requests to profile (0 stops)")
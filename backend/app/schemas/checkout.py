@@ -36,4 +36,5 @@ class OrderCreateRequest(BaseModel):
 class OrderCreateResponse(BaseModel):
     """Order creation response."""
     order_id: UUID = Field(..., description="Created order ID")
+    order_token: str = Field(..., description="Token for GET /api/orders/{order_id}/events")
     message: str = Field(..., description="Success message")
@@ -25,6 +25,7 @@ class OrderResponse(BaseModel):
     customer_name: Optional[str] = None
     special_instructions: Optional[str] = None
     payment_status: str
+    order_status: str
     created_at: datetime
     
     class Config:
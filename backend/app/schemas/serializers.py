@@ -0,0 +1,77 @@
+"""
+Precompiled serializers for hot responses.
+
+The TypedDicts mirror the response schemas field for field. TypeAdapter
+builds their serializer once at import. Serializing a plain dict against a
+TypedDict never validates it, so trusted database rows go straight to JSON
+bytes. Keep these in step with app/schemas/menu.py and order.py;
+test_serializers.py checks the field names match.
+"""
+from datetime import datetime
+from typing import Optional
+from typing_extensions import TypedDict
+from uuid import UUID
+from pydantic import TypeAdapter
+
+
+class OrderItemRow(TypedDict):
+    """Mirrors OrderItem."""
+    item_id: int
+    name: str
+    price: float
+    quantity: int
+    subtotal: float
+
+
+class OrderRow(TypedDict):
+    """Mirrors OrderResponse."""
+    id: UUID
+    table_number: int
+    items: list[OrderItemRow]
+    total_amount: float
+    customer_name: Optional[str]
+    special_instructions: Optional[str]
+    payment_status: str
+    order_status: str
+    created_at: datetime
+
+
+class MenuItemRow(TypedDict):
+    """Mirrors MenuItemResponse."""
+    id: int
+    name: str
+    description: Optional[str]
+    price: float
+    image_url: Optional[str]
+    is_available: bool
+
+
+class CategoryRow(TypedDict):
+    """Mirrors CategoryResponse."""
+    id: int
+    name: str
+    items: list[MenuItemRow]
+
+
+class MenuRow(TypedDict):
+    """Mirrors MenuResponse."""
+    table_number: int
+    categories: list[CategoryRow]
+
+
+class AdminOrderRow(TypedDict):
+    """Order dict sent to the admin dashboard (GET /admin/orders and WebSocket events)."""
+    id: str
+    table_number: int
+    items: list[dict]
+    total_amount: float
+    customer_name: Optional[str]
+    special_instructions: Optional[str]
+    payment_status: str
+    order_status: str
+    created_at: str
+
+
+order_serializer = TypeAdapter(OrderRow)
+menu_serializer = TypeAdapter(MenuRow)
+admin_orders_serializer = TypeAdapter(list[AdminOrderRow])
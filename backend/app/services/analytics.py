@@ -0,0 +1,228 @@
+"""
+Admin dashboard analytics.
+Imported on first use by the analytics routes rather than with the admin router.
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, and_, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.category import Category
+from app.models.order import Order
+from app.models.order_line import OrderLine
+
+
+async def dashboard_analytics(db: AsyncSession) -> dict:
+    """Sales and order totals, status breakdowns and the last 7 days."""
+    # Get current date boundaries
+    now = datetime.now(timezone.utc)
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=now.weekday())  # Start of week (Monday)
+    
+    # Get all orders
+    all_orders_result = await db.execute(select(Order))
+    all_orders = all_orders_result.scalars().all()
+    
+    # Calculate sales today (only paid orders)
+    today_sales_result = await db.execute(
+        select(func.sum(Order.total_amount))
+        .where(
+            and_(
+                Order.created_at >= today_start,
+                Order.payment_status == 'paid'
+            )
+        )
+    )
+    sales_today = float(today_sales_result.scalar() or 0)
+    
+    # Calculate sales this week (only paid orders)
+    week_sales_result = await db.execute(
+        select(func.sum(Order.total_amount))
+        .where(
+            and_(
+                Order.created_at >= week_start,
+                Order.payment_status == 'paid'
+            )
+        )
+    )
+    sales_this_week = float(week_sales_result.scalar() or 0)
+    
+    # Calculate total sales (all time, only paid orders)
+    total_sales_result = await db.execute(
+        select(func.sum(Order.total_amount))
+        .where(Order.payment_status == 'paid')
+    )
+    total_sales = float(total_sales_result.scalar() or 0)
+    
+    # Count orders today
+    today_orders_result = await db.execute(
+        select(func.count(Order.id))
+        .where(Order.created_at >= today_start)
+    )
+    orders_today = today_orders_result.scalar() or 0
+    
+    # Count orders this week
+    week_orders_result = await db.execute(
+        select(func.count(Order.id))
+        .where(Order.created_at >= week_start)
+    )
+    orders_this_week = week_orders_result.scalar() or 0
+    
+    # Total orders count
+    total_orders = len(all_orders)
+    
+    # Average order value (only paid orders)
+    paid_orders = [o for o in all_orders if o.payment_status == 'paid']
+    avg_order_value = float(sum(float(o.total_amount) for o in paid_orders) / len(paid_orders)) if paid_orders else 0
+    
+    # Orders by status
+    orders_by_status = {}
+    for order in all_orders:
+        status = getattr(order, 'order_status', 'pending')
+        orders_by_status[status] = orders_by_status.get(status, 0) + 1
+    
+    # Orders by payment status
+    orders_by_payment = {}
+    for order in all_orders:
+        payment_status = order.payment_status
+        orders_by_payment[payment_status] = orders_by_payment.get(payment_status, 0) + 1
+    
+    # Daily sales for the last 7 days
+    daily_sales = []
+    for i in range(6, -1, -1):  # Last 7 days including today
+        day_start = today_start - timedelta(days=i)
+        day_end = day_start + timedelta(days=1)
+        
+        day_sales_result = await db.execute(
+            select(func.sum(Order.total_amount))
+            .where(
+                and_(
+                    Order.created_at >= day_start,
+                    Order.created_at < day_end,
+                    Order.payment_status == 'paid'
+                )
+            )
+        )
+        day_sales = float(day_sales_result.scalar() or 0)
+        
+        daily_sales.append({
+            "date": day_start.strftime("%Y-%m-%d"),
+            "day": day_start.strftime("%a"),  # Day name (Mon, Tue, etc.)
+            "sales": day_sales
+        })
+    
+    # Daily orders for the last 7 days
+    daily_orders = []
+    for i in range(6, -1, -1):
+        day_start = today_start - timedelta(days=i)
+        day_end = day_start + timedelta(days=1)
+        
+        day_orders_result = await db.execute(
+            select(func.count(Order.id))
+            .where(
+                and_(
+                    Order.created_at >= day_start,
+                    Order.created_at < day_end
+                )
+            )
+        )
+        day_orders = day_orders_result.scalar() or 0
+        
+        daily_orders.append({
+            "date": day_start.strftime("%Y-%m-%d"),
+            "day": day_start.strftime("%a"),
+            "orders": day_orders
+        })
+    
+    return {
+        "sales": {
+            "today": sales_today,
+            "this_week": sales_this_week,
+            "total": total_sales
+        },
+        "orders": {
+            "today": orders_today,
+            "this_week": orders_this_week,
+            "total": total_orders
+        },
+        "average_order_value": avg_order_value,
+        "orders_by_status": orders_by_status,
+        "orders_by_payment_status": orders_by_payment,
+        "daily_sales": daily_sales,
+        "daily_orders": daily_orders
+    }
+
+
+async def item_analytics(db: AsyncSession, days: int, limit: int, paid_only: bool) -> dict:
+    """Top items, per-category totals and per-hour-of-day totals (UTC)."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    
+    conditions = [OrderLine.created_at >= since]
+    if paid_only:
+        conditions.append(
+            OrderLine.order_id.in_(select(Order.id).where(Order.payment_status == 'paid'))
+        )
+    
+    quantity = func.sum(OrderLine.quantity).label("quantity")
+    revenue = func.sum(OrderLine.subtotal).label("revenue")
+    order_count = func.count(func.distinct(OrderLine.order_id)).label("orders")
+    
+    # Top items by revenue
+    items_result = await db.execute(
+        select(OrderLine.menu_item_id, func.max(OrderLine.item_name), quantity, revenue, order_count)
+        .where(*conditions)
+        .group_by(OrderLine.menu_item_id)
+        .order_by(revenue.desc())
+        .limit(limit)
+    )
+    
+    # Revenue per category (category name resolved after aggregation)
+    categories_result = await db.execute(
+        select(OrderLine.category_id, Category.name, quantity, revenue, order_count)
+        .outerjoin(Category, Category.id == OrderLine.category_id)
+        .where(*conditions)
+        .group_by(OrderLine.category_id, Category.name)
+        .order_by(revenue.desc())
+    )
+    
+    # Sales per hour of day (literal zone so GROUP BY matches the select expression)
+    hour = func.extract("hour", func.timezone(literal_column("'UTC'"), OrderLine.created_at)).label("hour")
+    hours_result = await db.execute(
+        select(hour, quantity, revenue, order_count)
+        .where(*conditions)
+        .group_by(hour)
+        .order_by(hour)
+    )
+    
+    return {
+        "since": since.isoformat(),
+        "days": days,
+        "paid_only": paid_only,
+        "items": [
+            {
+                "item_id": item_id,
+                "name": name,
+                "quantity": int(qty or 0),
+                "revenue": float(rev or 0),
+                "orders": orders,
+            }
+            for item_id, name, qty, rev, orders in items_result.all()
+        ],
+        "categories": [
+            {
+                "category_id": category_id,
+                "name": name,
+                "quantity": int(qty or 0),
+                "revenue": float(rev or 0),
+                "orders": orders,
+            }
+            for category_id, name, qty, rev, orders in categories_result.all()
+        ],
+        "hours": [
+            {
+                "hour": int(hr),
+                "quantity": int(qty or 0),
+                "revenue": float(rev or 0),
+                "orders": orders,
+            }
+            for hr, qty, rev, orders in hours_result.all()
+        ],
+    }
@@ -0,0 +1,200 @@
+"""
+Broadcast backends for fanning WebSocket events out across app instances.
+
+ConnectionManager always delivers an event to its own sockets; the backend
+relays the serialized event to every *other* instance, which delivers it to
+its local sockets in turn.
+
+- LocalBroadcastBackend: in-process bus (single instance, tests).
+- PostgresBroadcastBackend: Postgres LISTEN/NOTIFY, for multiple Cloud Run
+  instances sharing one database.
+"""
+from typing import Callable, Optional
+from uuid import uuid4
+import asyncio
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; leave room for the header
+NOTIFY_CHUNK_SIZE = 7900
+MAX_PENDING_CHUNKED_MESSAGES = 100
+
+
+class BroadcastBackend:
+    """Base class: relays serialized events between app instances."""
+
+    def __init__(self):
+        self.instance_id = uuid4().hex[:12]
+        self._on_message: Optional[Callable[[str], None]] = None
+
+    async def start(self, on_message: Callable[[str], None]):
+        """Start relaying; `on_message` is called with events from other instances."""
+        self._on_message = on_message
+
+    def publish(self, message: str):
+        """Send a serialized event to other instances (non-blocking)."""
+
+    def backlog(self) -> tuple[int, int]:
+        """(events queued for other instances, queue capacity); (0, 0) when unbuffered."""
+        return 0, 0
+
+    async def stop(self):
+        """Stop relaying."""
+        self._on_message = None
+
+
+class LocalBroadcastBackend(BroadcastBackend):
+    """
+    In-process backend. Backends sharing a `bus` list behave like separate
+    instances, which lets tests exercise cross-instance fan-out without Postgres.
+    """
+
+    def __init__(self, bus: Optional[list] = None):
+        super().__init__()
+        self.bus = bus if bus is not None else []
+
+    async def start(self, on_message: Callable[[str], None]):
+        await super().start(on_message)
+        self.bus.append(self)
+
+    def publish(self, message: str):
+        for backend in self.bus:
+            if backend is not self and backend._on_message is not None:
+                backend._on_message(message)
+
+    async def stop(self):
+        if self in self.bus:
+            self.bus.remove(self)
+        await super().stop()
+
+
+class PostgresBroadcastBackend(BroadcastBackend):
+    """
+    LISTEN/NOTIFY backend on a dedicated asyncpg connection (outside the pool).
+
+    Each NOTIFY payload is "<instance>:<message id>:<index>:<count>:<body>".
+    Events larger than the NOTIFY limit are split into chunks sent in one
+    transaction, so they arrive together and in order, and are reassembled
+    by the listeners. Instances skip their own notifications.
+    """
+
+    def __init__(self, dsn: str, channel: str, connect_kwargs: Optional[dict] = None, queue_size: int = 1000):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.connect_kwargs = connect_kwargs or {}
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._message_counter = 0
+        self._partial: dict[tuple[str, str], list[Optional[str]]] = {}
+
+    async def start(self, on_message: Callable[[str], None]):
+        await super().start(on_message)
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, message: str):
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Broadcast NOTIFY queue full, dropping cross-instance event")
+
+    def backlog(self) -> tuple[int, int]:
+        return self._queue.qsize(), self._queue.maxsize
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await super().stop()
+
+    async def _run(self):
+        """Keep a LISTEN connection open and send queued events, reconnecting on failure."""
+        import asyncpg
+
+        backoff = 1
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(self.dsn, **self.connect_kwargs)
+                await conn.add_listener(self.channel, self._handle_notification)
+                logger.info(f"Listening for broadcast events on channel '{self.channel}'")
+                backoff = 1
+                while not conn.is_closed():
+                    try:
+                        message = await asyncio.wait_for(self._queue.get(), timeout=5)
+                    except asyncio.TimeoutError:
+                        continue
+                    await self._notify(conn, message)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Broadcast LISTEN connection failed: {e}")
+            finally:
+                if conn is not None and not conn.is_closed():
+                    try:
+                        await conn.close()
+                    except Exception:
+                        pass
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+    async def _notify(self, conn, message: str):
+        self._message_counter += 1
+        message_id = str(self._message_counter)
+        # Events are json.dumps output (ASCII), so characters == bytes
+        chunks = [
+            message[i:i + NOTIFY_CHUNK_SIZE]
+            for i in range(0, len(message), NOTIFY_CHUNK_SIZE)
+        ] or [""]
+        payloads = [
+            (self.channel, f"{self.instance_id}:{message_id}:{index}:{len(chunks)}:{chunk}")
+            for index, chunk in enumerate(chunks)
+        ]
+        if len(payloads) == 1:
+            await conn.execute("SELECT pg_notify($1, $2)", *payloads[0])
+        else:
+            async with conn.transaction():
+                await conn.executemany("SELECT pg_notify($1, $2)", payloads)
+
+    def _handle_notification(self, conn, pid: int, channel: str, payload: str):
+        try:
+            instance_id, message_id, index, count, body = payload.split(":", 4)
+            index, count = int(index), int(count)
+        except ValueError:
+            logger.warning("Ignoring malformed broadcast notification")
+            return
+        if instance_id == self.instance_id or self._on_message is None:
+            return
+        if count == 1:
+            self._on_message(body)
+            return
+
+        key = (instance_id, message_id)
+        parts = self._partial.get(key)
+        if parts is None:
+            if len(self._partial) >= MAX_PENDING_CHUNKED_MESSAGES:
+                self._partial.pop(next(iter(self._partial)))
+            parts = self._partial[key] = [None] * count
+        parts[index] = body
+        if all(part is not None for part in parts):
+            del self._partial[key]
+            self._on_message("".join(parts))
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    """Build the backend selected by settings.BROADCAST_BACKEND."""
+    if settings.BROADCAST_BACKEND == "postgres":
+        from app.database import connect_args
+        if settings.DB_PGBOUNCER_MODE and not settings.BROADCAST_DATABASE_URL:
+            logger.warning(
+                "DB_PGBOUNCER_MODE is on but BROADCAST_DATABASE_URL is not set: a transaction "
+                "pooler does not support LISTEN, so events from other instances may never arrive"
+            )
+        url = settings.BROADCAST_DATABASE_URL or settings.DATABASE_URL
+        dsn = url.replace("postgresql+asyncpg://", "postgresql://", 1)
+        # Only the SSL setting applies to the raw asyncpg LISTEN connection
+        connect_kwargs = {"ssl": connect_args["ssl"]} if "ssl" in connect_args else {}
+        return PostgresBroadcastBackend(dsn, settings.BROADCAST_CHANNEL, connect_kwargs=connect_kwargs)
+    return LocalBroadcastBackend()
@@ -0,0 +1,100 @@
+"""
+Fast path for the hottest customer reads.
+
+The menu and order lookups run on every QR scan and confirmation page, so
+they skip the ORM: each query is a fixed SQL string run directly on the
+session's asyncpg connection. asyncpg prepares and caches it per connection
+(unless DB_PGBOUNCER_MODE disables the cache), and rows come back as plain
+records without identity-map hydration. Admin CRUD stays on the ORM.
+"""
+from typing import Optional
+from uuid import UUID
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.query_metrics import current_request_stats
+
+TABLE_IS_ACTIVE_SQL = "SELECT 1 FROM tables WHERE table_number = $1 AND is_active"
+
+MENU_SQL = """
+SELECT c.id AS category_id, c.name AS category_name,
+       m.id, m.name, m.description, m.price, m.image_url, m.is_available
+FROM menu_items m
+JOIN categories c ON c.id = m.category_id
+WHERE m.is_available
+ORDER BY c.display_order, c.id, m.id
+"""
+
+ORDER_COLUMNS = """
+SELECT id, table_number, items, total_amount, customer_name,
+       special_instructions, payment_status, order_status, created_at
+FROM orders
+"""
+
+ORDER_BY_ID_SQL = ORDER_COLUMNS + "WHERE id = $1"
+
+ORDER_BY_SESSION_SQL = ORDER_COLUMNS + "WHERE stripe_session_id = $1"
+
+
+async def _fetch(db: AsyncSession, sql: str, *args) -> list:
+    """Run a query on the session's asyncpg connection and record it in the request stats."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    started = time.perf_counter()
+    rows = await raw_connection.driver_connection.fetch(sql, *args)
+    stats = current_request_stats()
+    if stats is not None:
+        stats.record(sql, time.perf_counter() - started)
+    return rows
+
+
+async def table_is_active(db: AsyncSession, table_number: int) -> bool:
+    """Whether the table exists and is active."""
+    return bool(await _fetch(db, TABLE_IS_ACTIVE_SQL, table_number))
+
+
+async def fetch_menu(db: AsyncSession) -> list[dict]:
+    """
+    Available menu items grouped by category, categories in display order.
+    Categories without available items are left out.
+    """
+    categories = []
+    current = None
+    for row in await _fetch(db, MENU_SQL):
+        if current is None or current["id"] != row["category_id"]:
+            current = {"id": row["category_id"], "name": row["category_name"], "items": []}
+            categories.append(current)
+        current["items"].append({
+            "id": row["id"],
+            "name": row["name"],
+            "description": row["description"],
+            "price": float(row["price"]),
+            "image_url": row["image_url"],
+            "is_available": row["is_available"],
+        })
+    return categories
+
+
+def _order_from_row(row) -> dict:
+    return {
+        "id": row["id"],
+        "table_number": row["table_number"],
+        "items": row["items"],
+        "total_amount": float(row["total_amount"]),
+        "customer_name": row["customer_name"],
+        "special_instructions": row["special_instructions"],
+        "payment_status": row["payment_status"],
+        "order_status": row["order_status"],
+        "created_at": row["created_at"],
+    }
+
+
+async def fetch_order(db: AsyncSession, order_id: UUID) -> Optional[dict]:
+    """Order by ID, or None."""
+    rows = await _fetch(db, ORDER_BY_ID_SQL, order_id)
+    return _order_from_row(rows[0]) if rows else None
+
+
+async def fetch_order_by_session(db: AsyncSession, session_id: str) -> Optional[dict]:
+    """Order by Stripe checkout session ID, or None."""
+    rows = await _fetch(db, ORDER_BY_SESSION_SQL, session_id)
+    return _order_from_row(rows[0]) if rows else None
@@ -0,0 +1,134 @@
+"""
+Liveness and readiness for load balancers.
+
+Liveness (GET /api/health) only says the process is serving. Readiness
+(GET /api/health/ready) says whether this instance can serve orders right
+now. It reads a database probe that runs in the background every
+HEALTH_PROBE_INTERVAL_SECONDS, so health checks never add database load or
+wait on a slow database themselves.
+"""
+from typing import Optional
+import asyncio
+import logging
+import time
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine, pool_stats
+from app.services.kitchen_queue import kitchen_queue
+from app.services.warmup import startup_timings
+from app.services.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+
+class DatabaseProbe:
+    """Periodic `SELECT 1` against the primary, with the last result cached."""
+
+    def __init__(self):
+        self.ok: Optional[bool] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start probing in the background (the first probe runs immediately)."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def probe(self):
+        """Run one probe and cache its result."""
+        started = time.perf_counter()
+        try:
+            # The timeout covers the pool checkout and connect too, not just the query
+            await asyncio.wait_for(self._select_one(), settings.HEALTH_PROBE_TIMEOUT_SECONDS)
+            self.ok = True
+            self.failures = 0
+            self.last_error = None
+        except Exception as e:
+            if self.ok is not False:
+                logger.warning(f"Database probe failed: {e!r}")
+            self.ok = False
+            self.failures += 1
+            self.last_error = repr(e)
+        self.latency_ms = round(1000 * (time.perf_counter() - started), 1)
+        self.checked_at = time.monotonic()
+
+    async def _select_one(self):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    def is_fresh(self) -> bool:
+        """Whether the cached result is recent enough to trust."""
+        return (
+            self.checked_at is not None
+            and time.monotonic() - self.checked_at <= 3 * settings.HEALTH_PROBE_INTERVAL_SECONDS
+        )
+
+    def status(self) -> dict:
+        return {
+            "ok": bool(self.ok) and self.is_fresh(),
+            "latency_ms": self.latency_ms,
+            "checked_seconds_ago": round(time.monotonic() - self.checked_at, 1) if self.checked_at is not None else None,
+            "consecutive_failures": self.failures,
+            "error": self.last_error,
+        }
+
+    async def _run(self):
+        while True:
+            await self.probe()
+            await asyncio.sleep(settings.HEALTH_PROBE_INTERVAL_SECONDS)
+
+
+def _pool_status() -> dict:
+    """Primary pool availability; saturated when every connection is out and requests are queueing."""
+    stats = pool_stats()
+    if "size" not in stats:
+        # NullPool: connections are opened per request, nothing to saturate
+        return {"ok": True, "waiting": stats["waiting"]}
+    capacity = stats["size"] + stats["max_overflow"]
+    available = max(capacity - stats["in_use"], 0)
+    return {
+        "ok": available > 0 or stats["waiting"] == 0,
+        "in_use": stats["in_use"],
+        "available": available,
+        "waiting": stats["waiting"],
+    }
+
+
+def _outbox_status() -> dict:
+    """Cross-instance event queue; full means events to other instances are being dropped."""
+    queued, capacity = manager.backend.backlog()
+    return {"ok": not capacity or queued < capacity, "queued": queued, "capacity": capacity}
+
+
+def _warm_status() -> dict:
+    """Warm-up and in-memory indexes. Reported only: cold caches slow requests but do not fail them."""
+    return {
+        "warmed_up": "total_ms" in startup_timings,
+        "kitchen_queue_loaded": kitchen_queue.loaded,
+    }
+
+
+def readiness() -> dict:
+    """Readiness report; `ready` is False when the database, pool or outbox cannot serve."""
+    checks = {
+        "database": db_probe.status(),
+        "pool": _pool_status(),
+        "outbox": _outbox_status(),
+    }
+    return {
+        "ready": all(check["ok"] for check in checks.values()),
+        "checks": checks,
+        "warm": _warm_status(),
+    }
+
+
+# Global instance
+db_probe = DatabaseProbe()
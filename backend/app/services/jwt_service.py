@@ -1,8 +1,9 @@
 """
 JWT service for admin authentication tokens.
 Provides stateless authentication that persists across server restarts.
+PyJWT (and the crypto backends it pulls in) is imported on first use to keep
+it out of cold start.
 """
-import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from app.config import settings
@@ -24,6 +25,7 @@ def create_admin_token() -> str:
         "exp": datetime.now(timezone.utc) + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
     }
     
+    import jwt
     token = jwt.encode(
         payload,
         settings.JWT_SECRET_KEY,
@@ -43,6 +45,7 @@ def verify_admin_token(token: str) -> bool:
     Returns:
         bool: True if token is valid, False otherwise
     """
+    import jwt
     try:
         payload = jwt.decode(
             token,
@@ -78,6 +81,7 @@ def get_token_expiration(token: str) -> Optional[datetime]:
     Returns:
         Optional[datetime]: Expiration time or None if invalid
     """
+    import jwt
     try:
         # Decode without verification to get expiration
         payload = jwt.decode(
@@ -0,0 +1,161 @@
+"""
+In-memory index of active orders for the kitchen display.
+Holds pending and accepted orders grouped by table, oldest first,
+so kitchen screens never have to scan the full order history.
+"""
+from typing import Optional
+from sqlalchemy import select
+import logging
+from app.database import read_session
+from app.models.order import Order
+from app.services.order_service import order_event_data
+from app.services.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+# Order statuses that keep an order on the kitchen display
+ACTIVE_ORDER_STATUSES = ("pending", "accepted")
+
+
+class KitchenQueue:
+    """
+    Active-order index keyed by order id and grouped by table number.
+
+    Dicts keep insertion order, so orders stay in arrival (age) order and
+    updating an existing order keeps its place in the queue. Every change
+    bumps `version` so screens can detect missed deltas and resync.
+    Versions are per instance, so snapshots and deltas carry `stream_id`
+    and are only comparable when it matches.
+    """
+
+    def __init__(self, stream_id: Optional[str] = None):
+        self.stream_id = stream_id
+        self.orders: dict[str, dict] = {}
+        self.by_table: dict[int, dict[str, dict]] = {}
+        self.version = 0
+        self.loaded = False
+
+    def load(self, orders: list[dict]):
+        """Replace the index with active orders (expected oldest first)."""
+        self.orders.clear()
+        self.by_table.clear()
+        for order_data in orders:
+            if order_data.get("order_status", "pending") in ACTIVE_ORDER_STATUSES:
+                self._put(order_data)
+        self.version += 1
+        self.loaded = True
+        logger.info(f"Kitchen queue loaded with {len(self.orders)} active orders")
+
+    def apply(self, order_data: dict) -> Optional[dict]:
+        """
+        Apply a created or updated order to the index.
+
+        Returns:
+            Delta ({"op": "upsert"|"remove", ...}) or None if nothing changed
+        """
+        order_id = str(order_data["id"])
+        if order_data.get("order_status", "pending") in ACTIVE_ORDER_STATUSES:
+            self._put(order_data)
+            return self._delta("upsert", order_id, order_data["table_number"], order_data)
+        removed = self._pop(order_id)
+        if removed is not None:
+            return self._delta("remove", order_id, removed["table_number"])
+        return None
+
+    def update_payment_status(self, order_id: str, payment_status: str) -> Optional[dict]:
+        """Update payment status of an active order. Returns a delta or None."""
+        order_data = self.orders.get(str(order_id))
+        if order_data is None or order_data.get("payment_status") == payment_status:
+            return None
+        order_data["payment_status"] = payment_status
+        return self._delta("upsert", str(order_id), order_data["table_number"], order_data)
+
+    def snapshot(self) -> dict:
+        """Active orders grouped by table, tables ordered by their oldest order."""
+        positions = {order_id: position for position, order_id in enumerate(self.orders)}
+        return {
+            "stream_id": self.stream_id,
+            "version": self.version,
+            "total_orders": len(self.orders),
+            "tables": [
+                {
+                    "table_number": table_number,
+                    "orders": list(table_orders.values()),
+                }
+                for table_number, table_orders in sorted(
+                    self.by_table.items(),
+                    key=lambda entry: positions[next(iter(entry[1]))],
+                )
+            ],
+        }
+
+    def _put(self, order_data: dict):
+        order_id = str(order_data["id"])
+        order_data = dict(order_data)
+        previous = self.orders.get(order_id)
+        if previous is not None and previous["table_number"] != order_data["table_number"]:
+            self._pop(order_id)
+        self.orders[order_id] = order_data
+        self.by_table.setdefault(order_data["table_number"], {})[order_id] = order_data
+
+    def _pop(self, order_id: str) -> Optional[dict]:
+        order_data = self.orders.pop(order_id, None)
+        if order_data is None:
+            return None
+        table_orders = self.by_table.get(order_data["table_number"])
+        if table_orders is not None:
+            table_orders.pop(order_id, None)
+            if not table_orders:
+                del self.by_table[order_data["table_number"]]
+        return order_data
+
+    def _delta(self, op: str, order_id: str, table_number: int, order_data: Optional[dict] = None) -> dict:
+        self.version += 1
+        delta = {"stream_id": self.stream_id, "version": self.version, "op": op, "order_id": order_id, "table_number": table_number}
+        if order_data is not None:
+            delta["order"] = order_data
+        return delta
+
+
+# Global instance
+kitchen_queue = KitchenQueue(stream_id=manager.stream_id)
+
+
+async def load_kitchen_queue():
+    """Seed the kitchen queue with active orders from the database."""
+    async with read_session(primary=True) as session:
+        result = await session.execute(
+            select(Order)
+            .where(Order.order_status.in_(ACTIVE_ORDER_STATUSES))
+            .order_by(Order.created_at, Order.id)
+        )
+        orders = result.scalars().all()
+    
+    kitchen_queue.load([order_event_data(order) for order in orders])
+
+
+async def sync_kitchen_order(order_data: dict):
+    """Apply a created or updated order to the kitchen queue and stream the delta."""
+    delta = kitchen_queue.apply(order_data)
+    if delta:
+        await manager.broadcast_kitchen_update(delta)
+
+
+async def sync_kitchen_payment_status(order_id: str, payment_status: str):
+    """Apply a payment status change to the kitchen queue and stream the delta."""
+    delta = kitchen_queue.update_payment_status(order_id, payment_status)
+    if delta:
+        await manager.broadcast_kitchen_update(delta)
+
+
+async def apply_remote_event(event: dict):
+    """Keep this instance's kitchen queue in step with order events from other instances."""
+    event_type = event.get("type")
+    data = event.get("data") or {}
+    if event_type in ("new_order", "order_status_update"):
+        await sync_kitchen_order(data)
+    elif event_type == "payment_status_update":
+        await sync_kitchen_payment_status(data["order_id"], data["payment_status"])
+
+
+manager.add_remote_listener(apply_remote_event)
@@ -0,0 +1,264 @@
+"""
+Prometheus metrics for this instance.
+
+Request counts and latency histograms are plain dicts and lists updated on
+the request path (a dict lookup, a bisect and a few adds per observation).
+Pool, WebSocket, SSE and cache figures already live in their owners and are
+read only when GET /metrics is scraped. Rendered in the Prometheus text
+exposition format, without a client library.
+"""
+from bisect import bisect_left
+from typing import Optional
+import time
+from app.config import settings
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WEBHOOK_LAG_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Bucket counts and sum for one label set."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # One count per bound plus +Inf; made cumulative when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class HistogramFamily:
+    """Histograms keyed by label values."""
+
+    def __init__(self, name: str, help: str, label_names: tuple, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series: dict[tuple, Histogram] = {}
+
+    def labels(self, *values) -> Histogram:
+        histogram = self.series.get(values)
+        if histogram is None:
+            histogram = self.series[values] = Histogram(self.buckets)
+        return histogram
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, histogram in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), histogram.counts):
+                cumulative += count
+                labels = _labels(self.label_names + ("le",), values + (str(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.label_names, values)
+            lines.append(f"{self.name}_sum{labels} {histogram.sum}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class CounterFamily:
+    """Counters keyed by label values."""
+
+    def __init__(self, name: str, help: str, label_names: tuple):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        self.series: dict[tuple, int] = {}
+
+    def inc(self, *values, amount: int = 1):
+        self.series[values] = self.series.get(values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self.series.items()):
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {count}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _gauge(name: str, help: str, samples: list[tuple[dict, float]], kind: str = "gauge") -> list[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+    return lines
+
+
+def _counter(name: str, help: str, samples: list[tuple[dict, float]]) -> list[str]:
+    """A running total kept by its owner (only ever increases until restart)."""
+    return _gauge(f"{name}_total", help, samples, kind="counter")
+
+
+# id() of a route object -> (route, full path template such as
+# "/api/orders/{order_id}"); routes define __eq__, so are not hashable
+_route_templates: dict[int, tuple] = {}
+
+
+def _collect_route_templates(routes):
+    for route in routes:
+        # FastAPI keeps included routers unflattened; their routes' own
+        # `path` lacks the prefixes they were included under
+        contexts = getattr(route, "effective_route_contexts", None)
+        if contexts is not None:
+            for context in contexts():
+                _route_templates[id(context.original_route)] = (context.original_route, context.path_format)
+        elif getattr(route, "path", None) is not None:
+            _route_templates[id(route)] = (route, route.path)
+
+
+def route_template(scope) -> Optional[str]:
+    """Full path template of the route that served the request, or None if unrouted."""
+    route = scope.get("route")
+    if getattr(route, "path", None) is None:
+        return None
+    entry = _route_templates.get(id(route))
+    if entry is None or entry[0] is not route:
+        _collect_route_templates(scope["app"].router.routes)
+        entry = _route_templates.get(id(route))
+        if entry is None or entry[0] is not route:
+            entry = _route_templates[id(route)] = (route, route.path)
+    return entry[1]
+
+
+requests_total = CounterFamily(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"),
+)
+request_seconds = HistogramFamily(
+    "http_request_duration_seconds", "HTTP request latency by route (SSE streams: stream lifetime).", ("method", "route"),
+)
+stripe_call_seconds = HistogramFamily(
+    "stripe_api_call_duration_seconds", "Stripe API call latency.", ("operation", "outcome"),
+)
+webhook_lag_seconds = HistogramFamily(
+    "stripe_webhook_lag_seconds", "Delay between Stripe creating an event and this instance receiving it.",
+    ("event_type",), WEBHOOK_LAG_BUCKETS,
+)
+
+
+class RequestGauges:
+    """Requests currently being served."""
+
+    def __init__(self):
+        self.in_flight = 0
+
+
+request_gauges = RequestGauges()
+
+
+def observe_webhook_lag(event: dict):
+    """Record how late a Stripe event arrived (its `created` is a Unix timestamp)."""
+    created = event.get("created")
+    if created:
+        webhook_lag_seconds.labels(event.get("type", "unknown")).observe(max(time.time() - created, 0.0))
+
+
+def _instance_gauges() -> list[str]:
+    """Gauges and running totals read from the pool, WebSocket manager, SSE channels and caches."""
+    from app.database import pool_stats
+    from app.logging_config import dropped_records
+    from app.services.kitchen_queue import kitchen_queue
+    from app.services.order_cache import order_cache
+    from app.services.order_stream import order_channels
+    from app.services.websocket_manager import manager
+
+    primary = pool_stats()
+    # One sample per engine, labelled with its role ("primary", "replica-0", ...)
+    pools = [primary, *primary["replicas"]]
+    websockets = manager.stats()
+    channels = order_channels.stats()
+    cache = order_cache.stats()
+    lines = _gauge("http_requests_in_flight", "HTTP requests being served.", [({}, request_gauges.in_flight)])
+    for key in ("size", "in_use", "idle", "overflow"):
+        samples = [({"role": pool["role"]}, pool[key]) for pool in pools if key in pool]
+        if samples:
+            lines += _gauge(f"db_pool_{key}", f"DB pool connections ({key}).", samples)
+    lines += _gauge("db_pool_waiting", "Requests waiting for a DB pool connection.", [
+        ({"role": pool["role"]}, pool["waiting"]) for pool in pools
+    ])
+    lines += _counter("db_pool_checkouts", "DB pool checkouts since start.", [
+        ({"role": pool["role"]}, pool["checkouts"]) for pool in pools
+    ])
+    lines += _counter("db_pool_timeouts", "DB pool checkout timeouts since start.", [
+        ({"role": pool["role"]}, pool["timeouts"]) for pool in pools
+    ])
+    lines += _gauge("db_pool_checkout_p95_seconds", "p95 of recent DB pool checkout waits.", [
+        ({"role": pool["role"]}, pool["checkout_ms"]["p95"] / 1000) for pool in pools
+    ])
+    lines += _gauge("websocket_connections", "Admin WebSocket connections.", [({}, websockets["connections"])])
+    lines += _gauge("websocket_queued_messages", "Messages queued to admin WebSockets.", [({}, websockets["queued_messages"])])
+    lines += _counter("websocket_slow_evictions", "Slow admin WebSockets evicted since start.", [({}, websockets["slow_evictions"])])
+    lines += _gauge("order_stream_subscribers", "Open customer order status streams (SSE).", [({}, channels["subscribers"])])
+    lines += _gauge("kitchen_queue_orders", "Active orders in the kitchen queue.", [({}, len(kitchen_queue.orders))])
+    lines += _gauge("order_cache_size", "Orders in the order lookup cache.", [({}, cache["size"])])
+    lines += _counter("order_cache_hits", "Order lookup cache hits since start.", [({}, cache["hits"])])
+    lines += _counter("order_cache_misses", "Order lookup cache misses since start.", [({}, cache["misses"])])
+    lines += _counter("log_records_dropped", "Log records dropped because the log queue was full.", [({}, dropped_records())])
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text format."""
+    lines = []
+    for family in (requests_total, request_seconds, stripe_call_seconds, webhook_lag_seconds):
+        lines += family.render()
+    lines += _instance_gauges()
+    return "\n".join(lines) + "\n"
+
+
+def metrics_authorized(authorization: Optional[str]) -> bool:
+    """
+    GET /metrics needs the METRICS_TOKEN bearer token when one is set. Without
+    a token it is open, except in production, where it stays closed.
+    """
+    if not settings.METRICS_TOKEN:
+        return settings.ENVIRONMENT != "production"
+    return authorization == f"Bearer {settings.METRICS_TOKEN}"
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting and timing HTTP requests per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        request_gauges.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_gauges.in_flight -= 1
+            # Label by route template, never the raw path, to keep series bounded
+            path = route_template(scope) or "unmatched"
+            requests_total.inc(scope["method"], path, status)
+            request_seconds.labels(scope["method"], path).observe(elapsed)
@@ -0,0 +1,118 @@
+"""
+Short-lived cache of order read models for the customer order lookups.
+
+The confirmation page reads its order right after checkout, often several
+times while the Stripe webhook and redirect race. Entries are keyed by order
+id, with a secondary index on stripe_session_id, and are:
+- written through by OrderService when an order is created,
+- dropped on every payment or order status event, from this or any other
+  instance (the admin event stream relays them),
+- expired after ORDER_CACHE_TTL_SECONDS in case an event is missed.
+
+A lookup that misses reads the order from the database and then fills the
+cache. Status events bump a generation counter, and a fill that started
+before the order's latest event is skipped, so a read that raced an update
+never caches the old status.
+"""
+from collections import OrderedDict
+from typing import Optional
+import time
+from app.config import settings
+from app.services.websocket_manager import manager
+
+
+class OrderCache:
+    """Bounded LRU of order dicts (as returned by the order lookups) with a TTL."""
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_size = max_size if max_size is not None else settings.ORDER_CACHE_SIZE
+        self.ttl = ttl if ttl is not None else settings.ORDER_CACHE_TTL_SECONDS
+        # order id -> (expires_at, stripe_session_id, order)
+        self._entries: OrderedDict[str, tuple[float, Optional[str], dict]] = OrderedDict()
+        self._by_session: dict[str, str] = {}
+        # Generation of each recently invalidated order's latest status event
+        self._generation = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        # Generation of the newest record dropped from _invalidated
+        self._forgotten = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+
+    def get(self, order_id) -> Optional[dict]:
+        """Cached order by id, or None."""
+        order_id = str(order_id)
+        entry = self._entries.get(order_id)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self.invalidate(order_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(order_id)
+        self.hits += 1
+        return entry[2]
+
+    def get_by_session(self, session_id: str) -> Optional[dict]:
+        """Cached order by Stripe checkout session id, or None."""
+        order_id = self._by_session.get(session_id)
+        if order_id is None:
+            self.misses += 1
+            return None
+        return self.get(order_id)
+
+    def generation(self) -> int:
+        """Take before reading an order from the database; pass to put() with the result."""
+        return self._generation
+
+    def put(self, order: dict, session_id: Optional[str] = None, generation: Optional[int] = None):
+        """
+        Cache an order, optionally also under its Stripe checkout session id.
+        With `generation` (from generation() before the read), the order is
+        skipped if a status event for it arrived since.
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        order_id = str(order["id"])
+        if generation is not None and (
+            generation < self._forgotten or self._invalidated.get(order_id, 0) > generation
+        ):
+            self.stale_fills += 1
+            return
+        self.invalidate(order_id)
+        self._entries[order_id] = (time.monotonic() + self.ttl, session_id, order)
+        if session_id:
+            self._by_session[session_id] = order_id
+        while len(self._entries) > self.max_size:
+            self.invalidate(next(iter(self._entries)))
+
+    def invalidate(self, order_id):
+        """Drop an order from the cache."""
+        entry = self._entries.pop(str(order_id), None)
+        if entry is not None and entry[1]:
+            self._by_session.pop(entry[1], None)
+
+    def on_event(self, event: dict):
+        """Drop orders whose payment or order status changed."""
+        if event.get("type") in ("payment_status_update", "order_status_update"):
+            order_id = str((event.get("data") or {}).get("order_id"))
+            self._generation += 1
+            self._invalidated[order_id] = self._generation
+            self._invalidated.move_to_end(order_id)
+            while len(self._invalidated) > 4 * max(self.max_size, 1):
+                _, self._forgotten = self._invalidated.popitem(last=False)
+            self.invalidate(order_id)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_fills": self.stale_fills,
+        }
+
+
+# Global instance
+order_cache = OrderCache()
+manager.add_event_listener(order_cache.on_event)
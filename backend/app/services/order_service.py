@@ -2,13 +2,15 @@
 Order service for business logic related to orders.
 """
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert
 from typing import Optional
 from uuid import UUID
 from decimal import Decimal
 from app.models.order import Order, PaymentStatus
 from app.models.menu_item import MenuItem
+from app.models.order_line import OrderLine
 from app.schemas.checkout import CheckoutItem
+from app.services.order_cache import order_cache
 
 
 class OrderService:
@@ -18,6 +20,7 @@ class OrderService:
     async def create_order(
         db: AsyncSession,
         table_id: int,
+        table_number: int,
         checkout_items: list[CheckoutItem],
         customer_name: Optional[str],
         special_instructions: Optional[str],
@@ -28,6 +31,7 @@ class OrderService:
         Args:
             db: Database session
             table_id: Table number
+            table_number: Table number stored on the order (denormalized)
             checkout_items: Items from checkout request (with id and quantity)
             customer_name: Optional customer name
             special_instructions: Optional special instructions
@@ -73,6 +77,7 @@ class OrderService:
         # Create order
         order = Order(
             table_id=table_id,
+            table_number=table_number,
             items=order_items,
             total_amount=total_amount,
             customer_name=customer_name,
@@ -83,8 +88,71 @@ class OrderService:
         db.add(order)
         await db.flush()  # Get the order ID without committing
         
+        # Write normalized order lines in one multi-row INSERT
+        await OrderService.insert_order_lines(db, order.id, order_items, menu_items)
+        
         return order
     
+    @staticmethod
+    async def insert_order_lines(
+        db: AsyncSession,
+        order_id: UUID,
+        order_items: list[dict],
+        menu_items: dict[int, MenuItem],
+    ) -> None:
+        """
+        Insert the normalized order_lines rows for an order.
+        
+        Issues a single multi-row INSERT ... VALUES statement. created_at
+        uses the transaction timestamp, which matches the order's own
+        server-side created_at default.
+        
+        Args:
+            db: Database session
+            order_id: Order UUID (must already be flushed)
+            order_items: Items as stored in Order.items
+            menu_items: Menu items keyed by id (used for category_id)
+        """
+        if not order_items:
+            return
+        
+        rows = [
+            {
+                "order_id": order_id,
+                "menu_item_id": item["item_id"],
+                "category_id": menu_items[item["item_id"]].category_id,
+                "item_name": item["name"],
+                "unit_price": Decimal(str(item["price"])),
+                "quantity": item["quantity"],
+                "subtotal": Decimal(str(item["subtotal"])),
+            }
+            for item in order_items
+        ]
+        await db.execute(insert(OrderLine).values(rows))
+    
+    @staticmethod
+    def read_model(order: Order) -> dict:
+        """Order as returned by the customer order lookups (see fast_reads)."""
+        return {
+            "id": order.id,
+            "table_number": order.table_number,
+            "items": order.items,
+            "total_amount": float(order.total_amount),
+            "customer_name": order.customer_name,
+            "special_instructions": order.special_instructions,
+            "payment_status": order.payment_status,
+            "order_status": order.order_status,
+            "created_at": order.created_at,
+        }
+    
+    @staticmethod
+    def cache_order(order: Order) -> None:
+        """
+        Write a committed order through to the order lookup cache.
+        Call after commit, so a rolled-back order is never served.
+        """
+        order_cache.put(OrderService.read_model(order), session_id=order.stripe_session_id)
+    
     @staticmethod
     async def update_order_payment_status(
         db: AsyncSession,
@@ -126,6 +194,8 @@ class OrderService:
             order.stripe_payment_intent_id = stripe_payment_intent_id
         
         await db.flush()
+        # Dropped again by the broadcast after commit, which also reaches other instances
+        order_cache.invalidate(order.id)
         return order
     
     @staticmethod
@@ -147,3 +217,14 @@ class OrderService:
             select(Order).where(Order.stripe_session_id == session_id)
         )
         return result.scalar_one_or_none()
+
+
+def order_event_data(order: Order) -> dict:
+    """
+    Order as sent to admin screens: WebSocket events, kitchen snapshots
+    and GET /admin/orders (see AdminOrderRow). JSON-ready.
+    """
+    data = OrderService.read_model(order)
+    data["id"] = str(order.id)
+    data["created_at"] = order.created_at.isoformat()
+    return data
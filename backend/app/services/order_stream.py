@@ -0,0 +1,99 @@
+"""
+Per-order status channels for customers.
+
+The confirmation page subscribes to its own order over Server-Sent Events
+instead of polling the order lookup. Channels are fed from the admin event
+stream (ConnectionManager), which already carries payment updates from the
+Stripe webhook and accept/reject/complete from the admin routes, on this
+instance and relayed from others.
+
+Access is authorized by an order token: an HMAC of the order ID, handed
+out only to whoever created the order, so order IDs alone are not enough.
+"""
+from typing import Optional
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+from app.config import settings
+from app.services.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+# Order statuses after which nothing more is pushed
+FINAL_ORDER_STATUSES = ("rejected", "completed")
+# Updates buffered per subscriber; only the latest status matters, so the oldest is dropped
+CHANNEL_QUEUE_SIZE = 10
+
+
+def create_order_token(order_id: str) -> str:
+    """Unguessable token granting access to one order's status channel."""
+    digest = hmac.new(
+        settings.JWT_SECRET_KEY.encode(),
+        f"order:{order_id}".encode(),
+        hashlib.sha256,
+    ).digest()
+    return base64.urlsafe_b64encode(digest[:24]).decode()
+
+
+def verify_order_token(order_id: str, token: Optional[str]) -> bool:
+    """Check a token against an order ID in constant time."""
+    return bool(token) and hmac.compare_digest(create_order_token(order_id), token)
+
+
+def status_message(order_id: str, payment_status: str, order_status: str) -> dict:
+    """Customer-facing status update (no admin-only fields)."""
+    return {
+        "order_id": order_id,
+        "payment_status": payment_status,
+        "order_status": order_status,
+    }
+
+
+class OrderChannels:
+    """Subscriber queues keyed by order ID."""
+
+    def __init__(self):
+        self.channels: dict[str, set[asyncio.Queue]] = {}
+
+    def subscribe(self, order_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=CHANNEL_QUEUE_SIZE)
+        self.channels.setdefault(order_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, order_id: str, queue: asyncio.Queue):
+        subscribers = self.channels.get(order_id)
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self.channels[order_id]
+
+    def on_event(self, event: dict):
+        """Forward payment and order status changes to the order's subscribers."""
+        if not self.channels or event.get("type") not in ("payment_status_update", "order_status_update"):
+            return
+        data = event.get("data") or {}
+        subscribers = self.channels.get(str(data.get("order_id")))
+        if not subscribers:
+            return
+        update = {
+            key: data[key]
+            for key in ("order_id", "payment_status", "order_status")
+            if key in data
+        }
+        for queue in subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+    def stats(self) -> dict:
+        return {
+            "orders": len(self.channels),
+            "subscribers": sum(len(subscribers) for subscribers in self.channels.values()),
+        }
+
+
+# Global instance
+order_channels = OrderChannels()
+manager.add_event_listener(order_channels.on_event)
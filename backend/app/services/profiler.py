@@ -0,0 +1,211 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request is profiled when it carries an `X-Profile: <admin token>` header,
+or when its route has a sample rate set through the admin API. While at
+least one profiled request is in flight, a background thread samples the
+event loop thread's stack every PROFILE_SAMPLE_INTERVAL_MS. A sample is
+credited to a request only if that request's middleware frame is on the
+stack, so other requests interleaved on the same loop are not mixed in.
+Code run in the threadpool (sync dependencies) is not sampled.
+
+Finished profiles are kept in a ring of PROFILE_RING_SIZE per instance, as
+folded stacks ("root;child;leaf count"), which flamegraph.pl, inferno and
+speedscope read directly.
+"""
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import uuid4
+import os
+import random
+import sys
+import threading
+import time
+from starlette.routing import compile_path
+from app.config import settings
+from app.services.metrics import route_template
+from app.services.jwt_service import verify_admin_token
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if "site-packages" in filename:
+        filename = filename.rsplit("site-packages" + os.sep, 1)[-1]
+    elif filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    # ';' separates frames in the folded format
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class RequestProfile:
+    """Folded stack samples for one request."""
+
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.trigger = trigger
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms = 0.0
+        self.samples = 0
+        self.folded: dict[str, int] = {}
+
+    def add(self, stack: list[str]):
+        """Record one sample; `stack` runs leaf first."""
+        key = ";".join(reversed(stack))
+        self.folded[key] = self.folded.get(key, 0) + 1
+        self.samples += 1
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "trigger": self.trigger,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+        }
+
+    def to_folded(self) -> str:
+        root = f"{self.method} {self.route or self.path}".replace(";", ":").replace(" ", "_")
+        lines = [f"{root};{stack} {count}" if stack else f"{root} {count}" for stack, count in self.folded.items()]
+        return "\n".join(lines) + "\n"
+
+
+class Profiler:
+    """Sampler thread, profile ring and per-route sample rates for this instance."""
+
+    def __init__(self):
+        self.profiles: deque[RequestProfile] = deque(maxlen=settings.PROFILE_RING_SIZE)
+        # "METHOD /route/template" -> fraction of requests to profile
+        self.route_rates: dict[str, float] = {}
+        # Same keys -> (method, compiled path template), to match requests before routing
+        self._route_patterns: dict[str, tuple] = {}
+        self._active: dict = {}  # middleware frame -> RequestProfile
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def attach(self, frame, profile: RequestProfile):
+        """Start crediting samples whose stack contains `frame` to `profile`."""
+        with self._lock:
+            self._active[frame] = profile
+            self._loop_thread_id = threading.get_ident()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+        self._wakeup.set()
+
+    def detach(self, frame, profile: RequestProfile):
+        """Stop sampling for a request and keep its profile."""
+        with self._lock:
+            self._active.pop(frame, None)
+        self.profiles.append(profile)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return next((profile for profile in self.profiles if profile.id == profile_id), None)
+
+    def set_route_rate(self, route: str, rate: float):
+        """Profile `rate` of requests to `route` ("GET /api/menu"); 0 stops sampling it."""
+        if rate > 0:
+            method, template = route.split(" ", 1)
+            self._route_patterns[route] = (method, compile_path(template)[0])
+            self.route_rates[route] = rate
+        else:
+            self.route_rates.pop(route, None)
+            self._route_patterns.pop(route, None)
+
+    def sampled_route(self, method: str, path: str) -> Optional[str]:
+        """The route with a sample rate that `method` and `path` fall under, or None."""
+        for route, (route_method, pattern) in self._route_patterns.items():
+            if route_method == method and pattern.match(path):
+                return route
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "sample_interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+            "ring_size": self.profiles.maxlen,
+            "route_rates": self.route_rates,
+            "active": len(self._active),
+            "profiles": [profile.summary() for profile in reversed(self.profiles)],
+        }
+
+    def _sample(self):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = []
+        while frame is not None:
+            profile = self._active.get(frame)
+            if profile is not None:
+                profile.add(stack)
+                return
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            time.sleep(settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+            with self._lock:
+                if not self._active:
+                    self._wakeup.clear()
+                    continue
+                self._sample()
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests asking for it (X-Profile header
+    with an admin token) or sampled from routes with a rate set. Profiled
+    responses carry an X-Profile-Id header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], trigger)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        frame = sys._getframe()
+        profiler.attach(frame, profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.duration_ms = round(1000 * (time.perf_counter() - started), 3)
+            profile.route = route_template(scope)
+            profiler.detach(frame, profile)
+
+    def _trigger(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return "header" if verify_admin_token(value.decode("latin-1")) else None
+        if profiler.route_rates:
+            route = profiler.sampled_route(scope["method"], scope["path"])
+            if route is not None and random.random() < profiler.route_rates[route]:
+                return "sampled"
+        return None
+
+
+# Global instance
+profiler = Profiler()
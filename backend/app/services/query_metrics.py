@@ -0,0 +1,177 @@
+"""
+Per-request SQL instrumentation.
+
+SQLAlchemy cursor events time every statement and attribute it to the HTTP
+request being served (tracked in a context variable). For each route we keep
+statement counts, total DB time and the slowest statements, and warn when a
+request repeats the same statement shape many times (an N+1 loop).
+"""
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.services.metrics import route_template
+
+logger = logging.getLogger(__name__)
+
+# Slowest statements kept per request and per route
+SLOWEST_STATEMENTS = 3
+# Longest statement text kept in reports
+STATEMENT_PREVIEW_LENGTH = 200
+
+
+class RequestQueryStats:
+    """Statements issued while serving one request."""
+
+    __slots__ = ("statements", "db_seconds", "slowest", "shapes", "round_trips_saved")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest: list[tuple[float, str]] = []
+        self.shapes: dict[str, int] = {}
+        self.round_trips_saved = 0
+
+    def record(self, statement: str, seconds: float):
+        self.statements += 1
+        self.db_seconds += seconds
+        # Statements are already parameterized ($1, $2, ...), so the text is the shape
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+        if len(self.slowest) < SLOWEST_STATEMENTS or seconds > self.slowest[-1][0]:
+            self.slowest.append((seconds, statement))
+            self.slowest.sort(key=lambda entry: entry[0], reverse=True)
+            del self.slowest[SLOWEST_STATEMENTS:]
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes issued at least `threshold` times."""
+        return [(shape, count) for shape, count in self.shapes.items() if count >= threshold]
+
+
+class RouteQueryStats:
+    """Statement totals for one route across requests."""
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_seconds = 0.0
+        self.round_trips_saved = 0
+        self.repeated_statement_warnings = 0
+        self.slowest: list[tuple[float, str]] = []
+
+    def add(self, stats: RequestQueryStats, repeated: int):
+        self.requests += 1
+        self.statements += stats.statements
+        self.max_statements = max(self.max_statements, stats.statements)
+        self.db_seconds += stats.db_seconds
+        self.round_trips_saved += stats.round_trips_saved
+        self.repeated_statement_warnings += repeated
+        self.slowest = sorted(self.slowest + stats.slowest, key=lambda entry: entry[0], reverse=True)[:SLOWEST_STATEMENTS]
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "avg_statements": round(self.statements / self.requests, 2) if self.requests else 0,
+            "max_statements": self.max_statements,
+            "avg_db_ms": round(1000 * self.db_seconds / self.requests, 3) if self.requests else 0,
+            "round_trips_saved": self.round_trips_saved,
+            "repeated_statement_warnings": self.repeated_statement_warnings,
+            "slowest": [
+                {"ms": round(1000 * seconds, 3), "statement": _preview(statement)}
+                for seconds, statement in self.slowest
+            ],
+        }
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+route_stats: dict[str, RouteQueryStats] = {}
+
+
+def _preview(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > STATEMENT_PREVIEW_LENGTH:
+        return statement[:STATEMENT_PREVIEW_LENGTH] + "..."
+    return statement
+
+
+def current_request_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being served, or None outside a request."""
+    return _current.get()
+
+
+def record_round_trips_saved(count: int):
+    """Credit round-trips avoided (e.g. by a read-only session) to the current request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.round_trips_saved += count
+
+
+def query_stats() -> dict:
+    """Per-route statement counts, DB time and slowest statements for this instance."""
+    return {
+        "repeat_warn_threshold": settings.QUERY_REPEAT_WARN_THRESHOLD,
+        "routes": {route: stats.to_dict() for route, stats in sorted(route_stats.items())},
+    }
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("query_started_at")
+    if stats is None or not started:
+        return
+    stats.record(statement, time.perf_counter() - started.pop())
+
+
+class QueryMetricsMiddleware:
+    """
+    ASGI middleware that collects statement stats for each HTTP request.
+
+    Adds X-DB-* response headers when QUERY_METRICS_HEADERS is enabled
+    (development by default) and logs statements repeated in one request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and settings.query_metrics_headers:
+                headers = list(message.get("headers", []))
+                headers.extend([
+                    (b"x-db-statements", str(stats.statements).encode()),
+                    (b"x-db-time-ms", f"{1000 * stats.db_seconds:.3f}".encode()),
+                    (b"x-db-slowest-ms", f"{1000 * stats.slowest[0][0]:.3f}".encode() if stats.slowest else b"0"),
+                ])
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            if route is not None:
+                self._finish(f"{scope['method']} {route}", stats)
+
+    def _finish(self, route: str, stats: RequestQueryStats):
+        repeated = stats.repeated_shapes(settings.QUERY_REPEAT_WARN_THRESHOLD)
+        for shape, count in repeated:
+            logger.warning(f"{route} ran the same statement {count} times (possible N+1): {_preview(shape)}")
+        route_stats.setdefault(route, RouteQueryStats()).add(stats, len(repeated))
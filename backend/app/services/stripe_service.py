@@ -2,13 +2,27 @@
 Stripe service for payment processing.
 Handles Checkout Session creation and webhook verification.
 """
-import stripe
+from functools import cache
+import json
 from typing import Optional
+import time
 from app.config import settings
 from app.schemas.checkout import CheckoutItem
+from app.services.metrics import stripe_call_seconds
 
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+
+@cache
+def get_stripe():
+    """
+    Import and configure the Stripe SDK on first use.
+    It is one of the slowest imports in the app and only checkout and the
+    webhook need it, so it stays out of cold start.
+    """
+    import stripe
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    if settings.STRIPE_API_BASE:
+        stripe.api_base = settings.STRIPE_API_BASE
+    return stripe
 
 
 class StripeService:
@@ -37,6 +51,8 @@ class StripeService:
         Returns:
             Dictionary with session_id and checkout_url
         """
+        stripe = get_stripe()
+        
         # Build line items for Stripe
         line_items = []
         for item in items:
@@ -52,18 +68,24 @@ class StripeService:
             })
         
         # Create checkout session
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            line_items=line_items,
-            mode="payment",
-            success_url=success_url,
-            cancel_url=cancel_url,
-            metadata={
-                "order_id": str(order_id),
-                "table_id": str(table_id),
-            },
-            customer_email=None,  # Optional: collect email if needed
-        )
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            session = stripe.checkout.Session.create(
+                payment_method_types=["card"],
+                line_items=line_items,
+                mode="payment",
+                success_url=success_url,
+                cancel_url=cancel_url,
+                metadata={
+                    "order_id": str(order_id),
+                    "table_id": str(table_id),
+                },
+                customer_email=None,  # Optional: collect email if needed
+            )
+            outcome = "ok"
+        finally:
+            stripe_call_seconds.labels("checkout.Session.create", outcome).observe(time.perf_counter() - started)
         
         return {
             "session_id": session.id,
@@ -85,11 +107,13 @@ class StripeService:
         Raises:
             ValueError: If signature verification fails
         """
+        stripe = get_stripe()
         try:
-            event = stripe.Webhook.construct_event(
+            stripe.Webhook.construct_event(
                 payload, signature, settings.STRIPE_WEBHOOK_SECRET
             )
-            return event
+            # Plain dict: newer SDKs return StripeObjects without dict methods (.get)
+            return json.loads(payload)
         except ValueError as e:
             raise ValueError(f"Invalid webhook payload: {e}")
         except stripe.error.SignatureVerificationError as e:
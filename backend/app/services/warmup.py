@@ -0,0 +1,101 @@
+"""
+Instance warm-up, run from the app lifespan before traffic is accepted.
+
+A fresh Cloud Run instance would otherwise make its first customers pay
+for TLS handshakes to the database, asyncpg statement preparation, the
+SQLAlchemy compile cache and first-use serializer setup. Each step is
+timed into `startup_timings`; a failing step is logged and skipped so the
+instance still starts (requests then warm things up lazily). The database
+steps share WARMUP_TIMEOUT_SECONDS, so an unreachable database cannot hold
+startup for the driver's connect timeout.
+"""
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from uuid import UUID
+import asyncio
+import logging
+import time
+from sqlalchemy import select
+from app.config import settings
+from app.database import read_session, replica_engines
+from app.models.menu_item import MenuItem
+from app.models.order import Order
+from app.models.table import Table
+from app.schemas.serializers import admin_orders_serializer, menu_serializer, order_serializer
+from app.services import fast_reads
+from app.services.kitchen_queue import load_kitchen_queue
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds per warm-up step, plus "total_ms"
+startup_timings: dict[str, float] = {}
+
+
+@asynccontextmanager
+async def timed(step: str):
+    """Record how long a warm-up step took; log and swallow its errors."""
+    started = time.perf_counter()
+    try:
+        yield
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up step '{step}' ran out of WARMUP_TIMEOUT_SECONDS, skipped")
+    except Exception as e:
+        logger.error(f"Warm-up step '{step}' failed: {e}")
+    finally:
+        startup_timings[f"{step}_ms"] = round(1000 * (time.perf_counter() - started), 1)
+
+
+async def _warm_connection(primary: bool):
+    """Open one pooled connection and prepare the hot statements on it."""
+    async with read_session(primary=primary) as db:
+        # Raw asyncpg statements are prepared and cached per connection
+        await fast_reads.table_is_active(db, 0)
+        await fast_reads.fetch_menu(db)
+        await fast_reads.fetch_order(db, UUID(int=0))
+        await fast_reads.fetch_order_by_session(db, "")
+        # ORM statements used by checkout and the admin views land in the compile cache
+        await db.execute(select(Table).where(Table.table_number == 0, Table.is_active == True))
+        await db.execute(select(MenuItem).where(MenuItem.id.in_([0])))
+        await db.execute(select(Order).order_by(Order.created_at.desc()).limit(1))
+
+
+async def warm_database():
+    """Open DB_WARMUP_CONNECTIONS connections per pool concurrently, warming each."""
+    # No point opening more than the pool keeps (with DB_POOL_SIZE=0 one still fills the compile cache)
+    count = min(max(settings.DB_WARMUP_CONNECTIONS, 0), max(settings.DB_POOL_SIZE, 1))
+    # Sessions are held concurrently, so each one checks out its own connection
+    targets = [True] * count + ([False] * count * len(replica_engines))
+    await asyncio.gather(*(_warm_connection(primary) for primary in targets))
+
+
+def warm_serializers():
+    """Run each precompiled serializer once."""
+    order = {
+        "id": UUID(int=0),
+        "table_number": 0,
+        "items": [],
+        "total_amount": 0.0,
+        "customer_name": None,
+        "special_instructions": None,
+        "payment_status": "pending",
+        "order_status": "pending",
+        "created_at": datetime.now(timezone.utc),
+    }
+    order_serializer.dump_json(order)
+    menu_serializer.dump_json({"table_number": 0, "categories": []})
+    admin_orders_serializer.dump_json([])
+
+
+async def warm_up():
+    """Warm the database pool, caches and in-memory indexes; record timings."""
+    started = time.perf_counter()
+    deadline = started + settings.WARMUP_TIMEOUT_SECONDS
+    async with timed("db_pool"):
+        await asyncio.wait_for(warm_database(), deadline - time.perf_counter())
+    async with timed("serializers"):
+        warm_serializers()
+    async with timed("kitchen_queue"):
+        # GET /api/admin/kitchen retries the load if this fails
+        await asyncio.wait_for(load_kitchen_queue(), deadline - time.perf_counter())
+    startup_timings["total_ms"] = round(1000 * (time.perf_counter() - started), 1)
+    logger.info(f"Warm-up finished: {startup_timings}")
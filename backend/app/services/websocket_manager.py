@@ -1,63 +1,412 @@
 """
 WebSocket manager for real-time order notifications.
+
+Each connection gets a bounded send queue drained by its own writer task,
+so a slow tablet never delays other screens or the request that triggered
+a broadcast. Broadcasts serialize the message once and hand it to a single
+dispatcher task; consumers whose queue overflows are evicted.
+
+Order events are also relayed to other app instances through a pluggable
+broadcast backend (see broadcast_backend.py).
+
+Every event delivered to this instance's sockets carries a sequence number
+("seq") and is kept in a bounded replay buffer. Sequence numbers belong to
+a stream identified by `stream_id` (one per process), so a client that
+reconnects with its `stream_id` and `last_seq` gets only the events it missed.
+
+Clients may subscribe to a subset of events (event types, tables or zones).
+Subscriptions are indexed by event type and by table number, so routing an
+event only touches the clients interested in it. A subscription may also set
+a batching window (`batch_ms`): events queued within the window are sent as
+one JSON array frame, with superseded status updates for the same order
+collapsed to the latest one.
+
+Clients choose an encoding per connection: JSON text frames (default; the
+server also negotiates permessage-deflate compression when the client offers
+it) or MessagePack binary frames. With `diff` enabled, order status updates
+carry only order_id and order_status instead of the full order. Each event
+is encoded at most once per (encoding, diff) combination, however many
+clients receive it.
+
+A heartbeat task pings connections that have been quiet for
+WS_PING_INTERVAL_SECONDS and reaps those silent for WS_IDLE_TIMEOUT_SECONDS,
+so half-open sockets don't linger until a send fails on them.
 """
-from typing import Set
+from typing import Awaitable, Callable, Iterable, Optional, Union
+from collections import deque
+from uuid import uuid4
 from fastapi import WebSocket
+import asyncio
 import json
 import logging
+import time
+from app.config import settings
+from app.services.broadcast_backend import BroadcastBackend, LocalBroadcastBackend
+
+try:
+    import msgpack
+except ImportError:  # Optional: only needed for encoding=msgpack clients
+    msgpack = None
 
 logger = logging.getLogger(__name__)
 
+# Close code sent to evicted slow consumers ("Try Again Later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Close code sent to peers reaped by the idle timeout ("Going Away")
+IDLE_CLOSE_CODE = 1001
+
+# Event types a client can subscribe to
+EVENT_TYPES = frozenset({"new_order", "order_status_update", "payment_status_update", "kitchen_update"})
+STATUS_EVENT_TYPES = frozenset({"order_status_update", "payment_status_update"})
+
+# Upper bound for a subscription's batching window
+MAX_BATCH_MS = 1000
+
+# Upper bound for the table numbers a client can list, so "tables=1-100000000"
+# cannot build a huge set in the request path
+MAX_SUBSCRIBED_TABLES = 1000
+
+# Wire encodings a client can negotiate
+ENCODINGS = ("json", "msgpack")
+
+
+class Event:
+    """A numbered event, its JSON frame, and the metadata used to route, coalesce and encode it."""
+
+    __slots__ = ("seq", "frame", "payload", "event_type", "table_number", "coalesce_key", "_encoded")
+
+    def __init__(self, seq: int, frame: str, payload: dict):
+        self.seq = seq
+        self.frame = frame  # JSON text of payload
+        self.payload = payload  # {"seq", "type", "data"}
+        self.event_type = payload["type"]
+        data = payload["data"]
+        self.table_number = data.get("table_number")
+        # (event_type, order_id) for status updates, where a later update supersedes an earlier one
+        self.coalesce_key = (
+            (self.event_type, data.get("order_id")) if self.event_type in STATUS_EVENT_TYPES else None
+        )
+        self._encoded: dict[tuple[str, bool], Union[str, bytes]] = {}
+
+    def body(self, diff: bool) -> dict:
+        """Event object to send; status updates shrink to the changed fields when diff is set."""
+        if diff and self.event_type == "order_status_update":
+            data = self.payload["data"]
+            return {
+                "seq": self.seq,
+                "type": self.event_type,
+                "data": {"order_id": data["order_id"], "order_status": data["order_status"]},
+            }
+        return self.payload
+
+    def encode(self, encoding: str, diff: bool) -> Union[str, bytes]:
+        """Encoded frame, computed once per (encoding, diff) and shared by all recipients."""
+        if encoding == "json" and not (diff and self.event_type == "order_status_update"):
+            return self.frame
+        key = (encoding, diff)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            body = self.body(diff)
+            encoded = msgpack.packb(body) if encoding == "msgpack" else json.dumps(body)
+            self._encoded[key] = encoded
+        return encoded
+
+
+def _split(value: Union[str, Iterable, None]) -> list[str]:
+    """Accept "a,b" strings or lists from query params and JSON messages."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [str(part).strip() for part in value if str(part).strip()]
+
+
+def parse_table_numbers(value: Union[str, Iterable, None]) -> set[int]:
+    """
+    Parse table numbers and ranges, e.g. "1-4,7" -> {1, 2, 3, 4, 7}.
+
+    Raises:
+        ValueError: If a part is not a number or range, or more than
+            MAX_SUBSCRIBED_TABLES tables are listed
+    """
+    tables = set()
+    for part in _split(value):
+        start, _, end = part.partition("-")
+        if end:
+            start, end = int(start), int(end)
+            if end - start >= MAX_SUBSCRIBED_TABLES:
+                raise ValueError(f"Table range {part} spans more than {MAX_SUBSCRIBED_TABLES} tables")
+            tables.update(range(start, end + 1))
+        else:
+            tables.add(int(start))
+        if len(tables) > MAX_SUBSCRIBED_TABLES:
+            raise ValueError(f"More than {MAX_SUBSCRIBED_TABLES} tables listed")
+    return tables
+
+
+class Subscription:
+    """
+    Which events a client receives. None means "no filter" for that dimension.
+    Events without a table_number (e.g. payment updates) pass the table filter.
+    """
+
+    def __init__(
+        self,
+        event_types: Optional[Iterable[str]] = None,
+        tables: Optional[Iterable[int]] = None,
+        batch_ms: int = 0,
+        encoding: str = "json",
+        diff: bool = False,
+    ):
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.tables = frozenset(tables) if tables is not None else None
+        self.batch_ms = batch_ms
+        self.encoding = encoding
+        self.diff = diff
+
+    @classmethod
+    def parse(
+        cls,
+        types: Union[str, Iterable, None] = None,
+        tables: Union[str, Iterable, None] = None,
+        zones: Union[str, Iterable, None] = None,
+        status_only: bool = False,
+        batch_ms: Union[str, int, None] = None,
+        encoding: Optional[str] = None,
+        diff: bool = False,
+    ) -> "Subscription":
+        """
+        Build a subscription from client parameters.
+        
+        Raises:
+            ValueError: If an event type, table number, zone, batch window or encoding is invalid
+        """
+        event_types = set(_split(types)) or None
+        if status_only:
+            event_types = set(STATUS_EVENT_TYPES) if event_types is None else event_types & STATUS_EVENT_TYPES
+        if event_types is not None and not event_types <= EVENT_TYPES:
+            raise ValueError(f"Unknown event types: {sorted(event_types - EVENT_TYPES)}")
+
+        table_numbers = parse_table_numbers(tables)
+        table_zones = settings.table_zones
+        for zone in _split(zones):
+            if zone not in table_zones:
+                raise ValueError(f"Unknown zone: {zone}")
+            table_numbers |= table_zones[zone]
+
+        batch_ms = int(batch_ms or 0)
+        if not 0 <= batch_ms <= MAX_BATCH_MS:
+            raise ValueError(f"batch_ms must be between 0 and {MAX_BATCH_MS}")
+
+        encoding = encoding or "json"
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding: {encoding}")
+        if encoding == "msgpack" and msgpack is None:
+            raise ValueError("msgpack encoding is not available on this server")
+        return cls(event_types, table_numbers or None, batch_ms, encoding, diff)
+
+    def matches(self, event_type: str, table_number: Optional[int]) -> bool:
+        if self.event_types is not None and event_type not in self.event_types:
+            return False
+        if self.tables is not None and table_number is not None and table_number not in self.tables:
+            return False
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "types": sorted(self.event_types) if self.event_types is not None else None,
+            "tables": sorted(self.tables) if self.tables is not None else None,
+            "batch_ms": self.batch_ms,
+            "encoding": self.encoding,
+            "diff": self.diff,
+        }
+
+
+class ClientConnection:
+    """
+    A connected WebSocket with its bounded send queue and writer task.
+    The queue holds Events and control frames (plain strings: hello, pong, ...).
+    """
+
+    def __init__(self, websocket: WebSocket, queue_size: int, subscription: Optional[Subscription] = None):
+        self.websocket = websocket
+        self.subscription = subscription or Subscription()
+        self.queue: asyncio.Queue[Union[Event, str]] = asyncio.Queue(maxsize=queue_size)
+        self.writer_task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.connected_at = time.monotonic()
+        self.last_seen = self.connected_at
+
+    def enqueue(self, message: Union[Event, str]) -> bool:
+        """Queue a message without blocking. Returns False if the queue is full."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
 
 class ConnectionManager:
     """Manages WebSocket connections for order notifications."""
+
+    def __init__(self, queue_size: Optional[int] = None, replay_size: Optional[int] = None):
+        self.queue_size = queue_size or settings.WS_SEND_QUEUE_SIZE
+        self.active_connections: dict[WebSocket, ClientConnection] = {}
+        self.stream_id = uuid4().hex
+        self.seq = 0
+        self.replay_buffer: deque[Event] = deque(
+            maxlen=replay_size or settings.WS_REPLAY_BUFFER_SIZE
+        )
+        # Subscription index: clients filtering on a key, plus clients not filtering on it
+        self._by_type: dict[str, set[ClientConnection]] = {}
+        self._any_type: set[ClientConnection] = set()
+        self._by_table: dict[int, set[ClientConnection]] = {}
+        self._any_table: set[ClientConnection] = set()
+        self._outbox: Optional[asyncio.Queue[Event]] = None
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self.backend: BroadcastBackend = LocalBroadcastBackend()
+        self._remote_listeners: list[Callable[[dict], Awaitable[None]]] = []
+        self._event_listeners: list[Callable[[dict], None]] = []
+        self.ping_interval = settings.WS_PING_INTERVAL_SECONDS
+        self.idle_timeout = settings.WS_IDLE_TIMEOUT_SECONDS
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # Fire-and-forget tasks (socket closes, remote listeners), kept until done
+        self._background_tasks: set[asyncio.Task] = set()
+        # Lifetime counters for stats()
+        self.total_connections = 0
+        self.slow_evictions = 0
+        self.idle_reaps = 0
     
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    async def start(self, backend: Optional[BroadcastBackend] = None):
+        """Start relaying events to and from other instances through `backend`."""
+        if backend is not None:
+            self.backend = backend
+        await self.backend.start(self._on_remote_message)
     
-    async def connect(self, websocket: WebSocket):
-        """Add a WebSocket connection to the manager (connection should already be accepted)."""
-        self.active_connections.add(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+    async def stop(self):
+        """Stop the broadcast backend and the heartbeat task."""
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        await self.backend.stop()
     
+    def add_remote_listener(self, listener: Callable[[dict], Awaitable[None]]):
+        """Register a coroutine called with each event received from another instance."""
+        self._remote_listeners.append(listener)
+
+    def add_event_listener(self, listener: Callable[[dict], None]):
+        """Register a callback run synchronously with every event delivered on this instance (local or relayed)."""
+        self._event_listeners.append(listener)
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        last_seq: Optional[int] = None,
+        stream_id: Optional[str] = None,
+        subscription: Optional[Subscription] = None,
+    ) -> bool:
+        """
+        Add a WebSocket connection to the manager (connection should already be accepted).
+        
+        Sends a `hello` frame with the current stream_id and seq. When the client
+        passes the stream_id and last_seq it saw before disconnecting, the missed
+        events are replayed from the buffer right after the hello frame.
+        Only events matching `subscription` (default: everything) are sent.
+        
+        Returns:
+            True if the client is up to date (fresh connection or gap replayed),
+            False if the gap is no longer buffered and the caller should send a snapshot
+        """
+        client = ClientConnection(websocket, self.queue_size, subscription)
+        # No awaits from here on: replay and registration must not interleave with broadcasts
+        missed = self._missed_events(last_seq, stream_id, client.subscription)
+        if missed is not None and len(missed) >= self.queue_size:
+            missed = None  # Gap larger than the send queue: fall back to a snapshot
+        client.enqueue(json.dumps({
+            "type": "hello",
+            "data": {
+                "stream_id": self.stream_id,
+                "seq": self.seq,
+                "resumed": missed is not None,
+                "subscription": client.subscription.to_dict(),
+            }
+        }))
+        for event in missed or ():
+            client.enqueue(event)
+        client.writer_task = asyncio.create_task(self._writer(client))
+        self.active_connections[websocket] = client
+        self.total_connections += 1
+        self._index(client)
+        self._ensure_dispatcher()
+        self._ensure_heartbeat()
+        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        return last_seq is None or missed is not None
+
     def disconnect(self, websocket: WebSocket):
-        """Remove a WebSocket connection."""
-        self.active_connections.discard(websocket)
+        """Remove a WebSocket connection and stop its writer task."""
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        self._unindex(client)
+        client.closed = True
+        if client.writer_task is not None and client.writer_task is not asyncio.current_task():
+            client.writer_task.cancel()
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
-    
+
+    def subscribe(self, websocket: WebSocket, subscription: Subscription):
+        """Replace a connection's subscription."""
+        client = self.active_connections.get(websocket)
+        if client is None:
+            return
+        self._unindex(client)
+        client.subscription = subscription
+        self._index(client)
+
+    def touch(self, websocket: WebSocket):
+        """Record that a connection is alive (call on every message received from it)."""
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.last_seen = time.monotonic()
+
+    def stats(self) -> dict:
+        """Connection counts, ages and queue depths for monitoring."""
+        now = time.monotonic()
+        clients = list(self.active_connections.values())
+        ages = sorted(now - client.connected_at for client in clients)
+        idle = [now - client.last_seen for client in clients]
+        return {
+            "connections": len(clients),
+            "total_connections": self.total_connections,
+            "slow_evictions": self.slow_evictions,
+            "idle_reaps": self.idle_reaps,
+            "connection_age_seconds": {
+                "min": round(ages[0], 1) if ages else 0,
+                "median": round(ages[len(ages) // 2], 1) if ages else 0,
+                "max": round(ages[-1], 1) if ages else 0,
+            },
+            "max_idle_seconds": round(max(idle), 1) if idle else 0,
+            "queued_messages": sum(client.queue.qsize() for client in clients),
+            "batching_connections": sum(1 for client in clients if client.subscription.batch_ms),
+            "seq": self.seq,
+            "replay_buffer_size": len(self.replay_buffer),
+        }
+
+    def send_to(self, websocket: WebSocket, message: str):
+        """Queue a message for a single connection (e.g. keepalive replies)."""
+        client = self.active_connections.get(websocket)
+        if client is not None and not client.enqueue(message):
+            self._evict(client)
+
     async def broadcast_order(self, order_data: dict):
         """Broadcast a new order to all connected clients."""
-        if not self.active_connections:
-            logger.info("No active WebSocket connections to broadcast to")
-            return
-        
-        message = json.dumps({
+        self._broadcast({
             "type": "new_order",
             "data": order_data
         })
-        
-        # Send to all connected clients
-        disconnected = set()
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error sending message to WebSocket: {e}")
-                disconnected.add(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
-        
-        logger.info(f"Broadcasted order to {len(self.active_connections)} clients")
-    
+
     async def broadcast_order_status_update(self, order_id: str, order_status: str, order_data: dict):
         """Broadcast an order status update to all connected clients."""
-        if not self.active_connections:
-            logger.info("No active WebSocket connections to broadcast to")
-            return
-        
-        message = json.dumps({
+        self._broadcast({
             "type": "order_status_update",
             "data": {
                 "order_id": order_id,
@@ -65,21 +414,271 @@ class ConnectionManager:
                 **order_data
             }
         })
-        
-        # Send to all connected clients
-        disconnected = set()
-        for connection in self.active_connections:
+
+    async def broadcast_payment_status_update(
+        self,
+        order_id: str,
+        payment_status: str,
+        table_number: Optional[int] = None,
+    ):
+        """Broadcast an order payment status change to all connected clients."""
+        self._broadcast({
+            "type": "payment_status_update",
+            "data": {
+                "order_id": order_id,
+                "payment_status": payment_status,
+                "table_number": table_number
+            }
+        })
+
+    async def broadcast_kitchen_update(self, delta: dict):
+        """
+        Broadcast a kitchen queue delta (upsert/remove of an active order).
+        Local only: every instance derives its own deltas from the order events.
+        """
+        self._broadcast({
+            "type": "kitchen_update",
+            "data": delta
+        }, relay=False)
+
+    def _broadcast(self, event: dict, relay: bool = True):
+        """Serialize an event once, deliver it locally and relay it to other instances."""
+        message = json.dumps(event)
+        self._deliver(message, event)
+        if relay:
+            self.backend.publish(message)
+
+    def _deliver(self, message: str, event: dict):
+        """Number a serialized event, buffer it for replay and hand it to the dispatcher (O(1))."""
+        seq = self.seq + 1
+        # Splice seq into the already-serialized object instead of re-encoding it.
+        # Built before seq is taken, so a malformed event leaves no gap.
+        numbered = Event(
+            seq=seq,
+            frame=f'{{"seq": {seq}, {message[1:]}',
+            payload={"seq": seq, **event},
+        )
+        self.seq = seq
+        self.replay_buffer.append(numbered)
+        if self.active_connections:
+            self._ensure_dispatcher()
+            self._outbox.put_nowait(numbered)
+        # A failing listener must not stop delivery to sockets or other instances
+        for listener in self._event_listeners:
             try:
-                await connection.send_text(message)
+                listener(event)
             except Exception as e:
-                logger.error(f"Error sending message to WebSocket: {e}")
-                disconnected.add(connection)
-        
-        # Remove disconnected connections
-        for connection in disconnected:
-            self.disconnect(connection)
-        
-        logger.info(f"Broadcasted order status update to {len(self.active_connections)} clients")
+                logger.error(f"WebSocket event listener failed: {e}", exc_info=True)
+
+    def _missed_events(
+        self,
+        last_seq: Optional[int],
+        stream_id: Optional[str],
+        subscription: Subscription,
+    ) -> Optional[list[Event]]:
+        """Buffered events after last_seq matching the subscription, or None if the gap cannot be replayed."""
+        if last_seq is None or stream_id != self.stream_id or last_seq > self.seq:
+            return None
+        if last_seq == self.seq:
+            return []
+        if not self.replay_buffer or self.replay_buffer[0].seq > last_seq + 1:
+            return None  # Gap already evicted from the buffer
+        return [
+            event
+            for event in self.replay_buffer
+            if event.seq > last_seq and subscription.matches(event.event_type, event.table_number)
+        ]
+
+    def _on_remote_message(self, message: str):
+        """Deliver an event relayed from another instance and notify listeners."""
+        try:
+            event = json.loads(message)
+            self._deliver(message, event)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            logger.warning("Ignoring malformed relayed event")
+            return
+        for listener in self._remote_listeners:
+            self._spawn(listener(event))
+
+    def _spawn(self, coro: Awaitable[None]):
+        """Run `coro` in the background, holding a reference until it finishes."""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_task_done)
+
+    def _background_task_done(self, task: asyncio.Task):
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("WebSocket background task failed", exc_info=task.exception())
+
+    def _ensure_heartbeat(self):
+        if self.ping_interval > 0 and (self._heartbeat_task is None or self._heartbeat_task.done()):
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self):
+        """Ping quiet connections and reap those idle past the timeout."""
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            now = time.monotonic()
+            ping = json.dumps({"type": "ping", "data": {"server_time": time.time()}})
+            for client in list(self.active_connections.values()):
+                idle = now - client.last_seen
+                if idle >= self.idle_timeout:
+                    logger.warning(f"Reaping WebSocket idle for {idle:.0f}s")
+                    self.idle_reaps += 1
+                    self.disconnect(client.websocket)
+                    self._spawn(self._close(client.websocket, IDLE_CLOSE_CODE, "Idle timeout"))
+                elif idle >= self.ping_interval and not client.enqueue(ping):
+                    self._evict(client)
+
+    def _ensure_dispatcher(self):
+        """Start the dispatcher, or restart it if it died, keeping events still queued."""
+        task = self._dispatcher_task
+        if task is not None and not task.done():
+            return
+        if task is not None and not task.cancelled() and task.exception() is not None:
+            logger.error("WebSocket dispatcher stopped, restarting", exc_info=task.exception())
+        # A fresh queue binds to the running loop; move over what the old one still holds
+        outbox: asyncio.Queue[Event] = asyncio.Queue()
+        while self._outbox is not None and not self._outbox.empty():
+            outbox.put_nowait(self._outbox.get_nowait())
+        if outbox.qsize():
+            logger.warning(f"Dispatcher restarted with {outbox.qsize()} queued events")
+        self._outbox = outbox
+        self._dispatcher_task = asyncio.create_task(self._dispatch())
+
+    def _index(self, client: ClientConnection):
+        subscription = client.subscription
+        if subscription.event_types is None:
+            self._any_type.add(client)
+        else:
+            for event_type in subscription.event_types:
+                self._by_type.setdefault(event_type, set()).add(client)
+        if subscription.tables is None:
+            self._any_table.add(client)
+        else:
+            for table_number in subscription.tables:
+                self._by_table.setdefault(table_number, set()).add(client)
+
+    def _unindex(self, client: ClientConnection):
+        subscription = client.subscription
+        self._any_type.discard(client)
+        for event_type in subscription.event_types or ():
+            clients = self._by_type.get(event_type)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    del self._by_type[event_type]
+        self._any_table.discard(client)
+        for table_number in subscription.tables or ():
+            clients = self._by_table.get(table_number)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    del self._by_table[table_number]
+
+    def _recipients(self, event_type: str, table_number: Optional[int]) -> list[ClientConnection]:
+        """
+        Clients subscribed to an event. Walks whichever index (type or table)
+        yields fewer candidates and checks the other dimension per candidate.
+        """
+        by_type = (self._by_type.get(event_type, ()), self._any_type)
+        if table_number is None:
+            candidates = by_type
+        else:
+            by_table = (self._by_table.get(table_number, ()), self._any_table)
+            if sum(map(len, by_table)) < sum(map(len, by_type)):
+                candidates = by_table
+            else:
+                candidates = by_type
+        return [
+            client
+            for group in candidates
+            for client in group
+            if client.subscription.matches(event_type, table_number)
+        ]
+
+    async def _dispatch(self):
+        """Fan serialized messages out to the send queues of subscribed connections."""
+        while True:
+            event = await self._outbox.get()
+            for client in self._recipients(event.event_type, event.table_number):
+                if not client.enqueue(event):
+                    self._evict(client)
+            # Let writer tasks run between messages of a burst
+            await asyncio.sleep(0)
+
+    async def _writer(self, client: ClientConnection):
+        """Drain a connection's send queue onto its socket, batching events if subscribed to."""
+        websocket = client.websocket
+        try:
+            while True:
+                item = await client.queue.get()
+                if isinstance(item, str):
+                    await websocket.send_text(item)
+                    continue
+                subscription = client.subscription
+                if not subscription.batch_ms:
+                    await self._send(websocket, item.encode(subscription.encoding, subscription.diff))
+                    continue
+
+                # Collect everything queued within the window into one array frame
+                await asyncio.sleep(subscription.batch_ms / 1000)
+                batch, control = [item], None
+                while not client.queue.empty():
+                    queued = client.queue.get_nowait()
+                    if isinstance(queued, str):
+                        control = queued  # Sent after the batch to keep ordering
+                        break
+                    batch.append(queued)
+                await self._send(websocket, self._batch_frame(batch, subscription))
+                if control is not None:
+                    await websocket.send_text(control)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending message to WebSocket: {e}")
+            self.disconnect(client.websocket)
+
+    @staticmethod
+    async def _send(websocket: WebSocket, frame: Union[str, bytes]):
+        if isinstance(frame, bytes):
+            await websocket.send_bytes(frame)
+        else:
+            await websocket.send_text(frame)
+
+    @staticmethod
+    def _batch_frame(batch: list[Event], subscription: Subscription) -> Union[str, bytes]:
+        """Encode events as one array, keeping only the latest status update per order."""
+        kept: list[Optional[Event]] = []
+        positions: dict[tuple[str, str], int] = {}
+        for event in batch:
+            if event.coalesce_key is not None:
+                previous = positions.get(event.coalesce_key)
+                if previous is not None:
+                    kept[previous] = None
+                positions[event.coalesce_key] = len(kept)
+            kept.append(event)
+        events = [event for event in kept if event is not None]
+        if subscription.encoding == "msgpack":
+            return msgpack.packb([event.body(subscription.diff) for event in events])
+        return "[" + ", ".join(event.encode("json", subscription.diff) for event in events) + "]"
+
+    def _evict(self, client: ClientConnection):
+        """Drop a consumer whose send queue overflowed and close its socket."""
+        if client.closed:
+            return
+        logger.warning(f"Evicting slow WebSocket consumer ({client.queue.qsize()} messages queued)")
+        self.slow_evictions += 1
+        self.disconnect(client.websocket)
+        self._spawn(self._close(client.websocket, SLOW_CONSUMER_CLOSE_CODE, "Slow consumer"))
+
+    @staticmethod
+    async def _close(websocket: WebSocket, code: int, reason: str):
+        try:
+            await websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
 
 
 # Global instance
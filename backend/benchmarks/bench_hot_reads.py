@@ -0,0 +1,126 @@
+"""
+Benchmark: ORM vs raw asyncpg for the hot customer reads.
+
+Compares the previous ORM implementation of the menu and order lookups
+(identity-map hydration + Pydantic re-packing) with app.services.fast_reads.
+Needs a database with the schema and some data (database/sample_data.sql):
+
+    cd backend
+    python -m benchmarks.bench_hot_reads --iterations 500 --table 1
+
+Both paths run on the same read-only session type as the routes.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from app.database import read_session
+from app.models.category import Category
+from app.models.menu_item import MenuItem
+from app.models.order import Order
+from app.models.table import Table
+from app.schemas.menu import MenuResponse, CategoryResponse, MenuItemResponse
+from app.schemas.order import OrderResponse
+from app.services import fast_reads
+
+
+async def orm_menu(db, table_number: int) -> MenuResponse:
+    table_result = await db.execute(
+        select(Table).where(Table.table_number == table_number, Table.is_active == True)
+    )
+    table_result.scalar_one()
+    categories = (await db.execute(
+        select(Category).order_by(Category.display_order, Category.id)
+    )).scalars().all()
+    items = (await db.execute(
+        select(MenuItem).where(MenuItem.is_available == True).order_by(MenuItem.id)
+    )).scalars().all()
+    items_by_category = {category.id: [] for category in categories}
+    for item in items:
+        if item.category_id in items_by_category:
+            items_by_category[item.category_id].append(MenuItemResponse.model_validate(item))
+    return MenuResponse(
+        table_number=table_number,
+        categories=[
+            CategoryResponse(id=category.id, name=category.name, items=items_by_category[category.id])
+            for category in categories
+            if items_by_category[category.id]
+        ],
+    )
+
+
+async def fast_menu(db, table_number: int) -> MenuResponse:
+    assert await fast_reads.table_is_active(db, table_number)
+    return MenuResponse(table_number=table_number, categories=await fast_reads.fetch_menu(db))
+
+
+async def orm_order(db, order_id) -> OrderResponse:
+    order = (await db.execute(
+        select(Order).options(selectinload(Order.table)).where(Order.id == order_id)
+    )).scalar_one()
+    return OrderResponse(
+        id=order.id,
+        table_number=order.table.table_number,
+        items=order.items,
+        total_amount=float(order.total_amount),
+        customer_name=order.customer_name,
+        special_instructions=order.special_instructions,
+        payment_status=order.payment_status,
+        order_status=order.order_status,
+        created_at=order.created_at,
+    )
+
+
+async def fast_order(db, order_id) -> OrderResponse:
+    return OrderResponse(**await fast_reads.fetch_order(db, order_id))
+
+
+async def measure(name: str, func, arg, iterations: int) -> list[float]:
+    """Run `func(session, arg)` in a fresh read session per call, like a request."""
+    # Warm up connections and statement caches
+    for _ in range(10):
+        async with read_session() as db:
+            await func(db, arg)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        async with read_session() as db:
+            await func(db, arg)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    print(
+        f"{name:<12} mean {1000 * statistics.mean(timings):7.3f} ms   "
+        f"p50 {1000 * timings[len(timings) // 2]:7.3f} ms   "
+        f"p95 {1000 * timings[int(len(timings) * 0.95)]:7.3f} ms"
+    )
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--table", type=int, default=1, help="Active table number to load the menu for")
+    args = parser.parse_args()
+
+    async with read_session() as db:
+        order_id = (await db.execute(select(Order.id).limit(1))).scalar()
+
+    print(f"{args.iterations} iterations per path\n")
+    await measure("menu orm", orm_menu, args.table, args.iterations)
+    await measure("menu fast", fast_menu, args.table, args.iterations)
+    if order_id is None:
+        print("\nNo orders in the database, skipping order lookups")
+        return
+    await measure("order orm", orm_order, order_id, args.iterations)
+    await measure("order fast", fast_order, order_id, args.iterations)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
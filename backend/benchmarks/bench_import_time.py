@@ -0,0 +1,88 @@
+"""
+Cold-start import profile: which modules make `import app.main` slow.
+
+Each measurement runs in a fresh interpreter with `python -X importtime`,
+so nothing is cached in sys.modules. Prints the cold import wall time and
+the slowest modules by cumulative and self time. Needs the usual env
+variables (DATABASE_URL etc.) but no database:
+
+    cd backend
+    python -m benchmarks.bench_import_time --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imported on first use only; importing any of them at startup is a regression
+LAZY_MODULES = ("stripe", "jwt", "app.services.analytics")
+
+TIMED_IMPORT = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(",".join(name for name in {lazy!r} if name in sys.modules))
+"""
+
+
+def _run(module: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    flags = ["-X", "importtime"] if importtime else []
+    code = TIMED_IMPORT.format(module=module, lazy=LAZY_MODULES)
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def cold_import(module: str = "app.main", runs: int = 3) -> tuple[float, list[str]]:
+    """
+    Best-of-`runs` cold import time in seconds, and which LAZY_MODULES the
+    import pulled in.
+    """
+    best = None
+    loaded: list[str] = []
+    for _ in range(runs):
+        seconds, modules = _run(module).stdout.splitlines()[-2:]
+        best = float(seconds) if best is None else min(best, float(seconds))
+        loaded = [name for name in modules.split(",") if name]
+    return best, loaded
+
+
+def import_profile(module: str = "app.main") -> list[tuple[str, int, int]]:
+    """(module, self_us, cumulative_us) for every module imported by `module`."""
+    rows = []
+    for line in _run(module, importtime=True).stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list per ranking")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters for the wall time")
+    args = parser.parse_args()
+
+    seconds, loaded = cold_import(args.module, args.runs)
+    print(f"Cold import of {args.module}: {seconds * 1000:.0f} ms (best of {args.runs})")
+    if loaded:
+        print(f"Lazy modules imported at startup: {', '.join(loaded)}")
+
+    rows = import_profile(args.module)
+    for title, key in (("cumulative", 2), ("self", 1)):
+        print(f"\nSlowest by {title} time (ms):")
+        for row in sorted(rows, key=lambda r: r[key], reverse=True)[:args.top]:
+            print(f"  {row[key] / 1000:8.1f}  {row[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Microbenchmark: per-response JSON serialization cost.
+
+Compares, for an order and a 60-item menu:
+- validated: build the Pydantic response model, jsonable_encoder, json.dumps
+  (the old path for routes returning models)
+- dump_json: build the model, then Pydantic's JSON serializer
+- trusted: precompiled TypeAdapter serializer on the plain row dict (no validation)
+
+No database needed:
+
+    cd backend
+    python -m benchmarks.bench_serializers --iterations 20000
+"""
+import argparse
+import json
+import sys
+import os
+import timeit
+from datetime import datetime, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from app.schemas.menu import MenuResponse
+from app.schemas.order import OrderResponse
+from app.schemas.serializers import menu_serializer, order_serializer
+
+
+def sample_order() -> dict:
+    return {
+        "id": uuid4(),
+        "table_number": 7,
+        "items": [
+            {"item_id": i, "name": f"Item {i}", "price": 9.5, "quantity": 2, "subtotal": 19.0}
+            for i in range(4)
+        ],
+        "total_amount": 76.0,
+        "customer_name": "Sam",
+        "special_instructions": "No onions",
+        "payment_status": "paid",
+        "order_status": "accepted",
+        "created_at": datetime.now(timezone.utc),
+    }
+
+
+def sample_menu() -> dict:
+    return {
+        "table_number": 7,
+        "categories": [
+            {
+                "id": c,
+                "name": f"Category {c}",
+                "items": [
+                    {
+                        "id": c * 100 + i,
+                        "name": f"Item {i}",
+                        "description": "A house favourite with seasonal sides",
+                        "price": 12.5,
+                        "image_url": None,
+                        "is_available": True,
+                    }
+                    for i in range(10)
+                ],
+            }
+            for c in range(6)
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    cases = [
+        ("order", OrderResponse, order_serializer, sample_order()),
+        ("menu", MenuResponse, menu_serializer, sample_menu()),
+    ]
+    print(f"{args.iterations} iterations, microseconds per response\n")
+    for name, model, serializer, row in cases:
+        paths = {
+            "validated": lambda: json.dumps(jsonable_encoder(model(**row))).encode(),
+            "dump_json": lambda: model(**row).model_dump_json().encode(),
+            "trusted": lambda: serializer.dump_json(row),
+        }
+        for path, func in paths.items():
+            seconds = min(timeit.repeat(func, number=args.iterations, repeat=3))
+            print(f"{name:<6} {path:<10} {1e6 * seconds / args.iterations:8.2f} us")
+        print()
+
+
+if __name__ == "__main__":
+    main()
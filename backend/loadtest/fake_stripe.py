@@ -0,0 +1,88 @@
+"""
+Stand-in for the Stripe API during load tests.
+
+Serves the one call the backend makes (POST /v1/checkout/sessions) with a
+configurable latency, and signs webhook events the way Stripe does so the
+backend's real signature check accepts them. Point the backend at it with
+STRIPE_API_BASE.
+"""
+from typing import Optional
+from urllib.parse import parse_qs
+from uuid import uuid4
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+class FakeStripe:
+    """Checkout sessions created so far, and the app serving them."""
+
+    def __init__(self, latency_seconds: float = 0.3):
+        self.latency_seconds = latency_seconds
+        # session id -> metadata sent by the backend (order_id, table_id)
+        self.sessions: dict[str, dict] = {}
+        self.app = FastAPI()
+        self.app.post("/v1/checkout/sessions")(self.create_checkout_session)
+        self._server: Optional[uvicorn.Server] = None
+
+    async def create_checkout_session(self, request: Request):
+        # Stripe requests are form-encoded, with nested keys like metadata[order_id]
+        form = parse_qs((await request.body()).decode())
+        metadata = {
+            key[len("metadata["):-1]: values[0]
+            for key, values in form.items()
+            if key.startswith("metadata[")
+        }
+        await asyncio.sleep(self.latency_seconds)
+        session_id = f"cs_test_{uuid4().hex}"
+        self.sessions[session_id] = metadata
+        return {
+            "id": session_id,
+            "object": "checkout.session",
+            "url": f"https://checkout.stripe.test/pay/{session_id}",
+            "metadata": metadata,
+            "payment_status": "unpaid",
+        }
+
+    async def start(self, port: int):
+        config = uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        serving = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            if serving.done():
+                raise SystemExit(f"Fake Stripe could not start on port {port}")
+            await asyncio.sleep(0.05)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+
+
+def checkout_completed_event(session_id: str, metadata: dict) -> bytes:
+    """checkout.session.completed event body for a session."""
+    return json.dumps({
+        "id": f"evt_{uuid4().hex}",
+        "object": "event",
+        "type": "checkout.session.completed",
+        "created": int(time.time()),
+        "data": {
+            "object": {
+                "id": session_id,
+                "object": "checkout.session",
+                "payment_intent": f"pi_{uuid4().hex}",
+                "payment_status": "paid",
+                "metadata": metadata,
+            },
+        },
+    }).encode()
+
+
+def signature_header(payload: bytes, secret: str) -> str:
+    """Stripe-Signature header value (t=timestamp,v1=HMAC-SHA256 of "timestamp.payload")."""
+    timestamp = int(time.time())
+    signed = hmac.new(secret.encode(), f"{timestamp}.".encode() + payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signed}"
@@ -1,4 +1,5 @@
 #!/bin/sh
 # Startup script that uses PORT environment variable
 PORT=${PORT:-8080}
-exec uvicorn app.main:app --host 0.0.0.0 --port "$PORT"
+# permessage-deflate compresses admin WebSocket JSON for clients that offer it
+exec uvicorn app.main:app --host 0.0.0.0 --port "$PORT" --ws-per-message-deflate true
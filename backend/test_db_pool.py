@@ -0,0 +1,183 @@
+"""
+Test script for the instrumented connection pool and the pre-ping setting.
+Uses in-memory SQLite connections, so no database server is needed.
+"""
+import sys
+import os
+import asyncio
+import sqlite3
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_checkout_and_timeout_accounting():
+    """Test that checkouts, timeouts and waiters are counted per InstrumentedQueuePool."""
+    print("Testing pool checkout accounting...")
+
+    def scenario():
+        from sqlalchemy import exc
+        from app.database import InstrumentedQueuePool
+
+        def new_pool():
+            return InstrumentedQueuePool(
+                lambda: sqlite3.connect(":memory:", check_same_thread=False),
+                pool_size=1, max_overflow=0, timeout=0.05,
+            )
+
+        pool, other = new_pool(), new_pool()
+        held = pool.connect()
+        try:
+            pool.connect()
+            return None
+        except exc.TimeoutError:
+            pass
+        held.close()
+        pool.connect().close()
+        other.connect().close()
+        # dispose() replaces the pool; counting continues in the same metrics
+        recreated = pool.recreate()
+        recreated.connect().close()
+        return (
+            pool.metrics.checkouts,
+            pool.metrics.timeouts,
+            pool.metrics.waiting,
+            other.metrics.checkouts,
+            recreated.metrics is pool.metrics,
+        )
+
+    try:
+        from sqlalchemy.util import greenlet_spawn
+        counts = asyncio.run(greenlet_spawn(scenario))
+        if counts != (4, 1, 0, 1, True):
+            print(f"❌ Expected 4 checkouts, 1 timeout, no waiters and separate pools, got {counts}")
+            return False
+        print("✅ Checkouts, timeouts and waiters counted per pool")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test pool accounting: {e}")
+        return False
+
+
+def test_idle_pre_ping():
+    """Test that "idle" pre-ping pings idle connections and replaces dead ones."""
+    print("Testing idle pre-ping...")
+
+    try:
+        from pydantic import ValidationError
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import QueuePool
+        from app.config import Settings, settings
+        from app.database import _InstrumentedPoolMixin, _ping_idle_connections
+
+        class InstrumentedSyncPool(_InstrumentedPoolMixin, QueuePool):
+            pass
+
+        try:
+            Settings(DB_POOL_PRE_PING="true")
+            print("❌ Unknown DB_POOL_PRE_PING value accepted")
+            return False
+        except ValidationError:
+            pass
+
+        engine = create_engine("sqlite://", poolclass=InstrumentedSyncPool, pool_size=1, max_overflow=0)
+        pool_metrics = engine.pool.metrics
+        _ping_idle_connections(engine)
+        pings = []
+        do_ping = engine.dialect.do_ping
+        engine.dialect.do_ping = lambda dbapi_connection: pings.append(1) or do_ping(dbapi_connection)
+        idle_seconds = settings.DB_POOL_PRE_PING_IDLE_SECONDS
+        try:
+            settings.DB_POOL_PRE_PING_IDLE_SECONDS = 3600
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            recently_used = len(pings)
+
+            settings.DB_POOL_PRE_PING_IDLE_SECONDS = 0
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                pooled = conn.connection.dbapi_connection
+            # Kill the idle pooled connection, as a database restart would
+            pooled.close()
+            failures = pool_metrics.ping_failures
+            with engine.connect() as conn:
+                alive = conn.execute(text("SELECT 1")).scalar()
+        finally:
+            settings.DB_POOL_PRE_PING_IDLE_SECONDS = idle_seconds
+            engine.dispose()
+        if recently_used != 0 or len(pings) < 2 or pool_metrics.ping_failures != failures + 1 or alive != 1:
+            print(f"❌ Unexpected pings ({recently_used} then {len(pings)}) or failures")
+            return False
+        print("✅ Only idle connections pinged; a dead one was replaced")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test idle pre-ping: {e}")
+        return False
+
+
+def test_replica_metrics_are_separate():
+    """Test that replica pool traffic is labelled with its role and does not count against the primary."""
+    print("Testing per-engine pool metrics...")
+
+    try:
+        from app import database
+        from app.services.health import _pool_status
+        from app.services.metrics import render_metrics
+
+        # Never connects: only its pool metrics are used
+        replica = database._create_engine(database.settings.DATABASE_URL, "replica-0")
+        database.replica_engines.append(replica)
+        try:
+            replica.pool.metrics.waiting = 3
+            replica.pool.metrics.checkouts = 7
+            stats = database.pool_stats()
+            pool_ok = _pool_status()["ok"]
+            body = render_metrics()
+        finally:
+            database.replica_engines.remove(replica)
+            replica.pool.metrics.waiting = 0
+        if stats["waiting"] != 0 or stats["replicas"][0]["waiting"] != 3 or not pool_ok:
+            print(f"❌ Replica waiters counted against the primary: {stats['waiting']}")
+            return False
+        if 'db_pool_checkouts_total{role="replica-0"} 7' not in body or 'db_pool_waiting{role="primary"} 0' not in body:
+            print("❌ Pool metrics not labelled by role")
+            return False
+        print("✅ Replica pool metrics kept apart and labelled by role")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test per-engine metrics: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Database Pool Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Checkout Accounting", test_checkout_and_timeout_accounting()),
+        ("Idle Pre-ping", test_idle_pre_ping()),
+        ("Per-engine Metrics", test_replica_metrics_are_separate()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
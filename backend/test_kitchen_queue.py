@@ -0,0 +1,159 @@
+"""
+Test script for the kitchen queue.
+Runs entirely in memory, so no database is needed.
+"""
+import sys
+import os
+import asyncio
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def _order(order_id: str, table_number: int, order_status: str = "pending", payment_status: str = "pending") -> dict:
+    return {
+        "id": order_id,
+        "table_number": table_number,
+        "items": [],
+        "total_amount": 10.0,
+        "payment_status": payment_status,
+        "order_status": order_status,
+        "created_at": "2026-01-01T18:00:00+00:00",
+    }
+
+
+def test_deltas_and_snapshot():
+    """Test upserts, removals, payment updates, versions and snapshot order."""
+    print("Testing kitchen queue deltas...")
+
+    try:
+        from app.services.kitchen_queue import KitchenQueue
+        queue = KitchenQueue(stream_id="stream-a")
+        queue.load([_order("a", 3), _order("b", 5), _order("c", 3, order_status="completed")])
+        if list(queue.orders) != ["a", "b"] or queue.version != 1:
+            print("❌ Load kept inactive orders or did not bump the version")
+            return False
+
+        upsert = queue.apply(_order("d", 5, order_status="accepted"))
+        paid = queue.update_payment_status("a", "paid")
+        unchanged = queue.update_payment_status("a", "paid")
+        removed = queue.apply(_order("b", 5, order_status="completed"))
+        unknown = queue.apply(_order("x", 9, order_status="rejected"))
+        if (upsert["op"], upsert["version"], paid["version"], removed["op"], removed["version"]) != ("upsert", 2, 3, "remove", 4):
+            print("❌ Unexpected deltas or versions")
+            return False
+        if upsert["stream_id"] != "stream-a" or unchanged is not None or unknown is not None or queue.version != 4:
+            print("❌ No-op changes produced deltas")
+            return False
+
+        # Moving an order to another table keeps it in one table, now at the back
+        queue.apply(_order("a", 7, payment_status="paid"))
+        snapshot = queue.snapshot()
+        tables = [(table["table_number"], [order["id"] for order in table["orders"]]) for table in snapshot["tables"]]
+        if tables != [(5, ["d"]), (7, ["a"])] or snapshot["total_orders"] != 2 or snapshot["version"] != 5 or snapshot["stream_id"] != "stream-a":
+            print(f"❌ Unexpected snapshot: {tables}")
+            return False
+        print("✅ Deltas, versions and snapshot are consistent")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test kitchen queue: {e}")
+        return False
+
+
+def test_remote_events():
+    """Test that order events from other instances update the kitchen queue."""
+    print("Testing remote kitchen queue events...")
+
+    async def scenario():
+        from app.services.kitchen_queue import apply_remote_event, kitchen_queue
+        from app.services.websocket_manager import manager
+        if kitchen_queue.stream_id != manager.stream_id:
+            return [], "kitchen queue not tagged with the manager's stream_id"
+        kitchen_queue.load([])
+        await apply_remote_event({"type": "new_order", "data": _order("r1", 2)})
+        await apply_remote_event({"type": "payment_status_update", "data": {"order_id": "r1", "payment_status": "paid"}})
+        await apply_remote_event({"type": "new_order", "data": _order("r2", 4)})
+        await apply_remote_event({"type": "order_status_update", "data": _order("r2", 4, order_status="rejected")})
+        await apply_remote_event({"type": "ping", "data": {}})
+        return list(kitchen_queue.orders), kitchen_queue.orders["r1"]["payment_status"]
+
+    try:
+        orders, payment_status = asyncio.run(scenario())
+        if orders != ["r1"] or payment_status != "paid":
+            print(f"❌ Remote events not applied: {orders}, {payment_status}")
+            return False
+        print("✅ Remote events applied to the kitchen queue")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to apply remote events: {e}")
+        return False
+
+
+def test_order_event_data():
+    """Test that admin order payloads match AdminOrderRow and feed the kitchen queue."""
+    print("Testing order event data...")
+
+    try:
+        from datetime import datetime, timezone
+        from decimal import Decimal
+        from uuid import uuid4
+        from app.models.order import Order
+        from app.schemas.serializers import AdminOrderRow
+        from app.services.kitchen_queue import KitchenQueue
+        from app.services.order_service import order_event_data
+
+        order = Order(
+            id=uuid4(), table_number=6, items=[], total_amount=Decimal("12.50"),
+            customer_name=None, special_instructions=None,
+            payment_status="pending", order_status="accepted",
+            created_at=datetime(2026, 1, 1, 18, tzinfo=timezone.utc),
+        )
+        data = order_event_data(order)
+        if set(data) != set(AdminOrderRow.__annotations__):
+            print(f"❌ Keys differ from AdminOrderRow: {sorted(data)}")
+            return False
+        if (data["id"], data["total_amount"], data["created_at"]) != (str(order.id), 12.5, "2026-01-01T18:00:00+00:00"):
+            print(f"❌ Unexpected values: {data}")
+            return False
+        queue = KitchenQueue()
+        queue.load([data])
+        if list(queue.orders) != [str(order.id)]:
+            print("❌ Kitchen queue did not accept the payload")
+            return False
+        print("✅ Order payloads are JSON-ready and shared with the kitchen queue")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to build order event data: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Kitchen Queue Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Deltas and Snapshot", test_deltas_and_snapshot()),
+        ("Remote Events", test_remote_events()),
+        ("Order Event Data", test_order_event_data()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""
+Test script for the Prometheus metrics subsystem.
+Checks histogram bucketing and that GET /metrics reports per-route requests.
+"""
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_histogram_buckets():
+    """Test that histogram buckets are inclusive and rendered cumulatively."""
+    print("Testing histogram buckets...")
+
+    try:
+        from app.services.metrics import HistogramFamily
+
+        family = HistogramFamily("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            family.labels("/x").observe(value)
+        lines = family.render()
+        expected = [
+            'test_seconds_bucket{route="/x",le="0.1"} 2',
+            'test_seconds_bucket{route="/x",le="1.0"} 3',
+            'test_seconds_bucket{route="/x",le="+Inf"} 4',
+            'test_seconds_count{route="/x"} 4',
+        ]
+        missing = [line for line in expected if line not in lines]
+        if missing:
+            print(f"❌ Missing lines: {missing}")
+            return False
+        print("✅ Buckets are inclusive and cumulative")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to render histogram: {e}")
+        return False
+
+
+def test_metrics_endpoint():
+    """Test that /metrics counts requests by full route template and honours METRICS_TOKEN."""
+    print("Testing /metrics endpoint...")
+
+    try:
+        from fastapi.testclient import TestClient
+        from app.config import settings
+        from app.main import app
+
+        client = TestClient(app)
+        client.get("/api/health")
+        # Served by a router included under /api; fails validation before touching the DB
+        client.get("/api/orders/not-a-uuid")
+        body = client.get("/metrics").text
+        if 'http_requests_total{method="GET",route="/api/health",status="200"}' not in body:
+            print("❌ Health check request not counted")
+            return False
+        if 'http_requests_total{method="GET",route="/api/orders/{order_id}",status="422"}' not in body:
+            print("❌ Included router request not labelled with its full route template")
+            return False
+        if "websocket_connections 0" not in body or "db_pool_waiting" not in body:
+            print("❌ Instance gauges missing")
+            return False
+        if "# TYPE db_pool_checkouts_total counter" not in body or "# TYPE order_cache_hits_total counter" not in body:
+            print("❌ Running totals not exported as counters")
+            return False
+
+        settings.METRICS_TOKEN = "scrape-secret"
+        try:
+            denied = client.get("/metrics").status_code
+            allowed = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code
+        finally:
+            settings.METRICS_TOKEN = None
+        if (denied, allowed) != (401, 200):
+            print(f"❌ Token check returned {denied}/{allowed}")
+            return False
+
+        environment = settings.ENVIRONMENT
+        settings.ENVIRONMENT = "production"
+        try:
+            tokenless = client.get("/metrics").status_code
+        finally:
+            settings.ENVIRONMENT = environment
+        if tokenless != 401:
+            print(f"❌ Production without METRICS_TOKEN returned {tokenless}")
+            return False
+        print("✅ Requests counted per route and token enforced")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to scrape metrics: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Metrics Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Histogram Buckets", test_histogram_buckets()),
+        ("Metrics Endpoint", test_metrics_endpoint()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
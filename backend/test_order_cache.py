@@ -0,0 +1,142 @@
+"""
+Test script for the order lookup cache.
+Runs entirely in memory, so no database is needed.
+"""
+import sys
+import os
+import asyncio
+import time
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_lookup_by_id_and_session():
+    """Test lookups by id and session, LRU eviction and expiry."""
+    print("Testing order cache lookups...")
+
+    try:
+        from app.services.order_cache import OrderCache
+        cache = OrderCache(max_size=2, ttl=60)
+        cache.put({"id": "order-1", "payment_status": "pending"}, session_id="cs_1")
+        cache.put({"id": "order-2", "payment_status": "pending"})
+        if cache.get_by_session("cs_1")["id"] != "order-1" or cache.get("order-2") is None:
+            print("❌ Cached orders not found by id and session")
+            return False
+
+        # order-1 was used more recently, so order-2 is evicted
+        cache.get("order-1")
+        cache.put({"id": "order-3", "payment_status": "pending"})
+        if cache.get("order-2") is not None or cache.get("order-1") is None:
+            print("❌ Least recently used order was not evicted")
+            return False
+
+        cache.ttl = 0.01
+        cache.put({"id": "order-4", "payment_status": "pending"}, session_id="cs_4")
+        time.sleep(0.02)
+        if cache.get_by_session("cs_4") is not None or "cs_4" in cache._by_session:
+            print("❌ Expired order was still served")
+            return False
+        print("✅ Orders found by id and session, evicted and expired")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test order cache: {e}")
+        return False
+
+
+def test_status_events_invalidate():
+    """Test that payment and status broadcasts drop the cached order."""
+    print("Testing order cache invalidation...")
+
+    async def scenario():
+        from app.services.order_cache import OrderCache
+        from app.services.websocket_manager import ConnectionManager
+        manager = ConnectionManager(queue_size=10)
+        cache = OrderCache(max_size=10, ttl=60)
+        manager.add_event_listener(cache.on_event)
+
+        cache.put({"id": "order-1", "payment_status": "pending"}, session_id="cs_1")
+        cache.put({"id": "order-2", "payment_status": "pending"})
+        await manager.broadcast_payment_status_update("order-1", "paid")
+        await manager.broadcast_order_status_update("order-2", "accepted", {"id": "order-2"})
+        return cache.get_by_session("cs_1") is None and cache.get("order-2") is None
+
+    try:
+        if asyncio.run(scenario()):
+            print("✅ Status changes invalidated the cached orders")
+            return True
+        print("❌ Stale orders still cached after status changes")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test invalidation: {e}")
+        return False
+
+
+def test_stale_fill_skipped():
+    """Test that a fill which started before a status event is not cached."""
+    print("Testing stale fills...")
+
+    try:
+        from app.services.order_cache import OrderCache
+        cache = OrderCache(max_size=1, ttl=60)
+        event = {"type": "payment_status_update", "data": {"order_id": "order-1", "payment_status": "paid"}}
+
+        # Lookup reads the pending row, the webhook's event lands, then the fill
+        generation = cache.generation()
+        cache.on_event(event)
+        cache.put({"id": "order-1", "payment_status": "pending"}, generation=generation)
+        if cache.get("order-1") is not None or cache.stale_fills != 1:
+            print("❌ Fill that raced a status event was cached")
+            return False
+
+        # A read that started after the event fills normally
+        cache.put({"id": "order-1", "payment_status": "paid"}, generation=cache.generation())
+        if cache.get("order-1") is None:
+            print("❌ Fresh fill was skipped")
+            return False
+
+        # Once the event record is forgotten, fills older than it are still refused
+        generation = cache.generation()
+        for index in range(2, 8):
+            cache.on_event({"type": "order_status_update", "data": {"order_id": f"order-{index}"}})
+        cache.put({"id": "order-2", "payment_status": "pending"}, generation=generation)
+        if cache.get("order-2") is not None:
+            print("❌ Fill older than a forgotten event was cached")
+            return False
+        print("✅ Fills that raced a status event were skipped")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test stale fills: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Order Cache Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Lookups", test_lookup_by_id_and_session()),
+        ("Invalidation", test_status_events_invalidate()),
+        ("Stale Fills", test_stale_fill_skipped()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
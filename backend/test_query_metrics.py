@@ -0,0 +1,117 @@
+"""
+Test script for per-request SQL instrumentation.
+Uses an in-memory SQLite engine, so no database server is needed.
+"""
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def build_app():
+    """Small app with one route that issues a statement in a loop."""
+    from fastapi import FastAPI
+    from sqlalchemy import create_engine, text
+    from app.services.query_metrics import QueryMetricsMiddleware
+
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+    app.add_middleware(QueryMetricsMiddleware)
+
+    @app.get("/items/{count}")
+    def read_items(count: int):
+        with engine.connect() as conn:
+            for item_id in range(count):
+                conn.execute(text("SELECT :item_id"), {"item_id": item_id})
+        return {"count": count}
+
+    return app
+
+
+def test_statements_are_counted_per_route():
+    """Test that each request's statements are counted and reported per route."""
+    print("Testing per-request statement counts...")
+
+    try:
+        from fastapi.testclient import TestClient
+        from app.config import settings
+        from app.services.query_metrics import query_stats
+
+        settings.QUERY_METRICS_HEADERS = True
+        client = TestClient(build_app())
+        response = client.get("/items/2")
+        client.get("/items/1")
+
+        if response.headers.get("x-db-statements") != "2":
+            print(f"❌ Expected X-DB-Statements: 2, got {response.headers.get('x-db-statements')}")
+            return False
+        route = query_stats()["routes"].get("GET /items/{count}")
+        if not route or route["requests"] != 2 or route["max_statements"] != 2:
+            print(f"❌ Unexpected route stats: {route}")
+            return False
+        print("✅ Statements counted per request and aggregated per route")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test statement counts: {e}")
+        return False
+    finally:
+        from app.config import settings
+        settings.QUERY_METRICS_HEADERS = None
+
+
+def test_repeated_statement_warning():
+    """Test that a statement repeated in a loop is flagged as a possible N+1."""
+    print("Testing N+1 detection...")
+
+    try:
+        from fastapi.testclient import TestClient
+        from app.config import settings
+        from app.services.query_metrics import query_stats, route_stats
+
+        route_stats.clear()
+        client = TestClient(build_app())
+        client.get(f"/items/{settings.QUERY_REPEAT_WARN_THRESHOLD - 1}")
+        if query_stats()["routes"]["GET /items/{count}"]["repeated_statement_warnings"] != 0:
+            print("❌ Warned below the threshold")
+            return False
+        client.get(f"/items/{settings.QUERY_REPEAT_WARN_THRESHOLD}")
+        if query_stats()["routes"]["GET /items/{count}"]["repeated_statement_warnings"] != 1:
+            print("❌ Repeated statement was not flagged")
+            return False
+        print("✅ Repeated statement flagged at the threshold")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test N+1 detection: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Query Metrics Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Statement Counts", test_statements_are_counted_per_route()),
+        ("N+1 Detection", test_repeated_statement_warning()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
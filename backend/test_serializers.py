@@ -0,0 +1,135 @@
+"""
+Test script for the precompiled response serializers.
+Checks that the TypedDict serializers stay in step with the response schemas.
+"""
+import sys
+import os
+import json
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_serializers import sample_order, sample_menu
+
+
+def test_serializer_fields_match_schemas():
+    """Test that every TypedDict has exactly the fields of its schema."""
+    print("Testing serializer fields against schemas...")
+
+    try:
+        from app.schemas.menu import MenuResponse, CategoryResponse, MenuItemResponse
+        from app.schemas.order import OrderResponse, OrderItem
+        from app.schemas.serializers import MenuRow, CategoryRow, MenuItemRow, OrderRow, OrderItemRow
+
+        pairs = [
+            (OrderResponse, OrderRow),
+            (OrderItem, OrderItemRow),
+            (MenuResponse, MenuRow),
+            (CategoryResponse, CategoryRow),
+            (MenuItemResponse, MenuItemRow),
+        ]
+        for model, row in pairs:
+            if set(model.model_fields) != set(row.__annotations__):
+                print(f"❌ {row.__name__} does not match {model.__name__}")
+                return False
+        print("✅ All serializers match their schemas")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to compare fields: {e}")
+        return False
+
+
+def test_trusted_output_matches_validated_output():
+    """Test that serializing a trusted row gives the same JSON as the response model."""
+    print("Testing trusted serialization output...")
+
+    try:
+        from fastapi.encoders import jsonable_encoder
+        from app.schemas.menu import MenuResponse
+        from app.schemas.order import OrderResponse
+        from app.schemas.serializers import menu_serializer, order_serializer
+
+        order = sample_order()
+        # Rows may carry extra keys; they must not leak into the response
+        order["items"][0]["category_id"] = 3
+        menu = sample_menu()
+        # FastAPI's response_model path, used before the precompiled serializers
+        cases = [
+            (json.loads(order_serializer.dump_json(order)), json.loads(json.dumps(jsonable_encoder(OrderResponse(**order))))),
+            (json.loads(menu_serializer.dump_json(menu)), json.loads(json.dumps(jsonable_encoder(MenuResponse(**menu))))),
+        ]
+        if not all(trusted == validated for trusted, validated in cases):
+            print("❌ Trusted output differs from the response model")
+            return False
+        if json.loads(order_serializer.dump_json(order)).get("order_status") != "accepted":
+            print("❌ order_status dropped from the order response")
+            return False
+        print("✅ Trusted and validated output are identical")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to compare output: {e}")
+        return False
+
+
+def test_default_response_class():
+    """Test that routes returning plain data are rendered by FastJSONResponse."""
+    print("Testing default response class...")
+
+    try:
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.responses import FastJSONResponse
+        from app.services.jwt_service import create_admin_token
+
+        rendered = []
+        render = FastJSONResponse.render
+        FastJSONResponse.render = lambda self, content: rendered.append(content) or render(self, content)
+        try:
+            client = TestClient(app)
+            # One route on the app, one in the router included under /api
+            health = client.get("/api/health")
+            profiling = client.get(
+                "/api/admin/profiling", headers={"Authorization": f"Bearer {create_admin_token()}"},
+            )
+        finally:
+            FastJSONResponse.render = render
+        if (health.status_code, profiling.status_code) != (200, 200) or len(rendered) != 2:
+            print(f"❌ FastJSONResponse rendered {len(rendered)} of 2 responses")
+            return False
+        print("✅ Plain responses rendered with orjson")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to check response class: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Serializer Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Schema Fields", test_serializer_fields_match_schemas()),
+        ("Trusted Output", test_trusted_output_matches_validated_output()),
+        ("Default Response Class", test_default_response_class()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
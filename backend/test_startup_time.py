@@ -0,0 +1,114 @@
+"""
+Test script for the cold-start import budget.
+Fails when importing app.main gets slower than the budget, or when a
+lazily loaded module (Stripe, PyJWT, admin analytics) is imported at startup.
+
+Budget: STARTUP_IMPORT_BUDGET_SECONDS (default 1.5), best of 3 fresh interpreters.
+Profile a regression with: python -m benchmarks.bench_import_time
+"""
+import sys
+import os
+import asyncio
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.bench_import_time import cold_import
+
+STARTUP_IMPORT_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", "1.5"))
+
+
+def test_lazy_modules_not_imported():
+    """Test that importing app.main leaves the lazily loaded modules alone."""
+    print("Testing lazy modules stay out of startup...")
+
+    try:
+        _, loaded = cold_import(runs=1)
+        if loaded:
+            print(f"❌ Imported at startup: {', '.join(loaded)}")
+            return False
+        print("✅ No lazy modules imported at startup")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to import app.main: {e}")
+        return False
+
+
+def test_cold_import_within_budget():
+    """Test that a cold import of app.main stays within the budget."""
+    print("Testing cold import time...")
+
+    try:
+        seconds, _ = cold_import(runs=3)
+        if seconds > STARTUP_IMPORT_BUDGET_SECONDS:
+            print(f"❌ Cold import took {seconds:.2f}s (budget {STARTUP_IMPORT_BUDGET_SECONDS:.2f}s)")
+            return False
+        print(f"✅ Cold import took {seconds:.2f}s (budget {STARTUP_IMPORT_BUDGET_SECONDS:.2f}s)")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to import app.main: {e}")
+        return False
+
+
+def test_warm_up_time_limit():
+    """Test that a hanging database cannot hold warm-up past WARMUP_TIMEOUT_SECONDS."""
+    print("Testing warm-up time limit...")
+
+    async def hang():
+        # Like connecting to an unreachable database
+        await asyncio.sleep(60)
+
+    try:
+        import time
+        from app.config import settings
+        from app.services import warmup
+
+        saved = warmup.warm_database, warmup.load_kitchen_queue, settings.WARMUP_TIMEOUT_SECONDS
+        warmup.warm_database = warmup.load_kitchen_queue = hang
+        settings.WARMUP_TIMEOUT_SECONDS = 0.2
+        try:
+            started = time.perf_counter()
+            asyncio.run(warmup.warm_up())
+            elapsed = time.perf_counter() - started
+        finally:
+            warmup.warm_database, warmup.load_kitchen_queue, settings.WARMUP_TIMEOUT_SECONDS = saved
+        if elapsed > 1 or "total_ms" not in warmup.startup_timings:
+            print(f"❌ Warm-up took {elapsed:.2f}s with a 0.2s limit")
+            return False
+        print(f"✅ Warm-up gave up on the database after {elapsed:.2f}s and finished")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test warm-up time limit: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("Startup Time Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Lazy Modules", test_lazy_modules_not_imported()),
+        ("Import Budget", test_cold_import_within_budget()),
+        ("Warm-up Time Limit", test_warm_up_time_limit()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
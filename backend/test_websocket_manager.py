@@ -0,0 +1,611 @@
+"""
+Test script for the WebSocket connection manager.
+Uses in-memory fake sockets, so no server or database is needed.
+"""
+import sys
+import os
+import asyncio
+
+# Add the app directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeWebSocket:
+    """Minimal stand-in for fastapi.WebSocket that records sent messages."""
+
+    def __init__(self, send_delay: float = 0):
+        self.send_delay = send_delay
+        self.sent = []
+        self.close_code = None
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.send_delay)
+        self.sent.append(message)
+
+    async def send_bytes(self, message: bytes):
+        await asyncio.sleep(self.send_delay)
+        self.sent.append(message)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.close_code = code
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_broadcast_reaches_all_clients():
+    """Test that every connected client receives a broadcast."""
+    print("Testing broadcast to all clients...")
+
+    async def scenario():
+        from app.services.websocket_manager import ConnectionManager
+        manager = ConnectionManager(queue_size=10)
+        clients = [FakeWebSocket() for _ in range(3)]
+        for ws in clients:
+            await manager.connect(ws)
+        await manager.broadcast_order({"id": "order-1", "table_number": 1})
+        await asyncio.sleep(0.01)
+        # hello frame + the order
+        return all(len(ws.sent) == 2 for ws in clients)
+
+    try:
+        if run(scenario()):
+            print("✅ All clients received the broadcast")
+            return True
+        print("❌ Some clients did not receive the broadcast")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test broadcast: {e}")
+        return False
+
+
+def test_slow_consumer_is_evicted():
+    """Test that a slow client is evicted without delaying the caller or other clients."""
+    print("\nTesting slow consumer eviction...")
+
+    async def scenario():
+        import time
+        from app.services.websocket_manager import ConnectionManager, SLOW_CONSUMER_CLOSE_CODE
+        manager = ConnectionManager(queue_size=3)
+        fast, slow = FakeWebSocket(), FakeWebSocket(send_delay=10)
+        await manager.connect(fast)
+        await manager.connect(slow)
+
+        started = time.perf_counter()
+        for i in range(6):
+            await manager.broadcast_order({"id": f"order-{i}", "table_number": 1})
+        caller_cost = time.perf_counter() - started
+
+        await asyncio.sleep(0.05)
+        return (
+            caller_cost < 0.05
+            and len(fast.sent) == 7
+            and slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+            and slow not in manager.active_connections
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Slow consumer evicted, fast client unaffected")
+            return True
+        print("❌ Slow consumer handling is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test slow consumer eviction: {e}")
+        return False
+
+
+def test_cross_instance_fan_out():
+    """Test that events reach sockets connected to another instance."""
+    print("\nTesting cross-instance fan-out...")
+
+    async def scenario():
+        from app.services.websocket_manager import ConnectionManager
+        from app.services.broadcast_backend import LocalBroadcastBackend
+        bus = []
+        instance_a, instance_b = ConnectionManager(), ConnectionManager()
+        await instance_a.start(LocalBroadcastBackend(bus))
+        await instance_b.start(LocalBroadcastBackend(bus))
+        ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+        await instance_a.connect(ws_a)
+        await instance_b.connect(ws_b)
+
+        await instance_a.broadcast_order({"id": "order-1", "table_number": 1})
+        await instance_a.broadcast_kitchen_update({"version": 1, "op": "remove", "order_id": "order-1"})
+        await asyncio.sleep(0.01)
+        # Kitchen deltas are per-instance and must not be relayed (+1 hello frame each)
+        return len(ws_a.sent) == 3 and len(ws_b.sent) == 2
+
+    try:
+        if run(scenario()):
+            print("✅ Order events relayed across instances")
+            return True
+        print("❌ Cross-instance fan-out is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test cross-instance fan-out: {e}")
+        return False
+
+
+def test_failing_listener_is_isolated():
+    """Test that a failing event listener or a malformed relayed event does not stop delivery."""
+    print("Testing event listener isolation...")
+
+    async def scenario():
+        from app.services.websocket_manager import ConnectionManager
+        from app.services.broadcast_backend import LocalBroadcastBackend
+        bus = []
+        instance_a, instance_b = ConnectionManager(), ConnectionManager()
+        await instance_a.start(LocalBroadcastBackend(bus))
+        await instance_b.start(LocalBroadcastBackend(bus))
+
+        def broken_listener(event):
+            raise RuntimeError("SSE queue closed")
+
+        instance_a.add_event_listener(broken_listener)
+        ws_a, ws_b = FakeWebSocket(), FakeWebSocket()
+        await instance_a.connect(ws_a)
+        await instance_b.connect(ws_b)
+
+        await instance_a.broadcast_order({"id": "order-1", "table_number": 1})
+        # A relayed event without "data" cannot be numbered
+        instance_b._on_remote_message('{"type": "new_order"}')
+        await instance_a.broadcast_order({"id": "order-2", "table_number": 1})
+        await asyncio.sleep(0.01)
+        seqs = [event.seq for event in instance_b.replay_buffer]
+        # +1 hello frame each
+        return len(ws_a.sent) == 3 and len(ws_b.sent) == 3 and seqs == [1, 2] and instance_b.seq == 2
+
+    try:
+        if run(scenario()):
+            print("✅ Events delivered and relayed despite a failing listener, no seq gaps")
+            return True
+        print("❌ A failing listener or malformed event disrupted delivery")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test listener isolation: {e}")
+        return False
+
+
+def test_reconnect_replays_gap():
+    """Test that a reconnecting client gets only missed events, or a snapshot signal."""
+    print("\nTesting resumable event stream...")
+
+    async def scenario():
+        import json
+        from app.services.websocket_manager import ConnectionManager
+        manager = ConnectionManager(replay_size=3)
+        for i in range(2):
+            await manager.broadcast_order({"id": f"order-{i}", "table_number": 1})
+        last_seq = manager.seq
+        for i in range(2, 4):
+            await manager.broadcast_order({"id": f"order-{i}", "table_number": 1})
+
+        resumed_ws = FakeWebSocket()
+        resumed = await manager.connect(resumed_ws, last_seq=last_seq, stream_id=manager.stream_id)
+        await asyncio.sleep(0.01)
+        frames = [json.loads(frame) for frame in resumed_ws.sent]
+
+        # Gap of 4 events no longer fits in a 3-event buffer
+        evicted = await manager.connect(FakeWebSocket(), last_seq=0, stream_id=manager.stream_id)
+        # A different stream (other instance or restart) can never be replayed
+        other_stream = await manager.connect(FakeWebSocket(), last_seq=last_seq, stream_id="other")
+        return (
+            resumed
+            and frames[0]["type"] == "hello"
+            and [frame["seq"] for frame in frames[1:]] == [3, 4]
+            and not evicted
+            and not other_stream
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Missed events replayed, evicted gaps fall back to snapshot")
+            return True
+        print("❌ Resumable stream is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test resumable stream: {e}")
+        return False
+
+
+def test_topic_subscriptions():
+    """Test that events are routed only to clients subscribed to them."""
+    print("\nTesting topic subscriptions...")
+
+    async def scenario():
+        import json
+        from app.services.websocket_manager import ConnectionManager, Subscription
+        manager = ConnectionManager()
+        everything, bar, status = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(everything)
+        await manager.connect(bar, subscription=Subscription.parse(tables="1-4"))
+        await manager.connect(status, subscription=Subscription.parse(status_only=True))
+
+        await manager.broadcast_order({"id": "order-1", "table_number": 2})
+        await manager.broadcast_order({"id": "order-2", "table_number": 9})
+        await manager.broadcast_order_status_update("order-2", "accepted", {"id": "order-2", "table_number": 9})
+        await asyncio.sleep(0.01)
+
+        def seqs(ws):
+            return [json.loads(frame)["seq"] for frame in ws.sent[1:]]
+
+        return (
+            seqs(everything) == [1, 2, 3]
+            and seqs(bar) == [1]
+            and seqs(status) == [3]
+            and len(manager._recipients("new_order", 2)) == 2
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Events routed by type and table")
+            return True
+        print("❌ Topic routing is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test topic subscriptions: {e}")
+        return False
+
+
+def test_table_range_limit():
+    """Test that oversized table ranges are rejected like malformed ones."""
+    print("Testing table range limit...")
+
+    try:
+        from app.services.websocket_manager import MAX_SUBSCRIBED_TABLES, Subscription
+        allowed = Subscription.parse(tables=f"1-{MAX_SUBSCRIBED_TABLES}")
+        rejected = []
+        for tables in ("1-100000000", f"1-{MAX_SUBSCRIBED_TABLES},2001-2002", "a-b"):
+            try:
+                Subscription.parse(tables=tables)
+            except ValueError:
+                rejected.append(tables)
+        if len(allowed.tables) != MAX_SUBSCRIBED_TABLES or len(rejected) != 3:
+            print(f"❌ Unexpected table limits: rejected {rejected}")
+            return False
+        print(f"✅ Subscriptions limited to {MAX_SUBSCRIBED_TABLES} tables")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test table range limit: {e}")
+        return False
+
+
+def test_batching_coalesces_status_updates():
+    """Test that a batching subscription gets one array frame with superseded updates collapsed."""
+    print("\nTesting event batching...")
+
+    async def scenario():
+        import json
+        from app.services.websocket_manager import ConnectionManager, Subscription
+        manager = ConnectionManager()
+        batched = FakeWebSocket()
+        await manager.connect(batched, subscription=Subscription.parse(batch_ms=20))
+        await asyncio.sleep(0.01)  # let the hello frame go out
+
+        order = {"id": "order-1", "table_number": 1}
+        await manager.broadcast_order(order)
+        await manager.broadcast_order_status_update("order-1", "accepted", order)
+        await manager.broadcast_order_status_update("order-1", "completed", order)
+        await asyncio.sleep(0.05)
+
+        frames = batched.sent[1:]
+        if len(frames) != 1:
+            return False
+        events = json.loads(frames[0])
+        return (
+            [event["type"] for event in events] == ["new_order", "order_status_update"]
+            and events[1]["data"]["order_status"] == "completed"
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Events batched into one frame, superseded update dropped")
+            return True
+        print("❌ Event batching is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test event batching: {e}")
+        return False
+
+
+def test_heartbeat_reaps_idle_connections():
+    """Test that quiet clients are pinged and silent ones are reaped."""
+    print("\nTesting heartbeats and idle reaping...")
+
+    async def scenario():
+        import json
+        from app.services.websocket_manager import ConnectionManager, IDLE_CLOSE_CODE
+        manager = ConnectionManager()
+        manager.ping_interval, manager.idle_timeout = 0.02, 0.07
+        alive, silent = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alive)
+        await manager.connect(silent)
+
+        for _ in range(6):
+            await asyncio.sleep(0.02)
+            manager.touch(alive)  # alive answers every ping
+        await manager.stop()
+
+        stats = manager.stats()
+        return (
+            any(json.loads(frame)["type"] == "ping" for frame in silent.sent)
+            and silent.close_code == IDLE_CLOSE_CODE
+            and alive in manager.active_connections
+            and stats["connections"] == 1
+            and stats["idle_reaps"] == 1
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Idle connection pinged and reaped, live one kept")
+            return True
+        print("❌ Heartbeat handling is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test heartbeats: {e}")
+        return False
+
+
+def test_compact_encodings():
+    """Test MessagePack frames and field-level diffs for status updates."""
+    print("\nTesting compact encodings...")
+
+    async def scenario():
+        import json
+        import msgpack
+        from app.services.websocket_manager import ConnectionManager, Subscription
+        manager = ConnectionManager()
+        packed, diffed = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(packed, subscription=Subscription.parse(encoding="msgpack", diff=True))
+        await manager.connect(diffed, subscription=Subscription.parse(diff=True))
+
+        order = {"id": "order-1", "table_number": 1, "items": [{"name": "Soup"}] * 10}
+        await manager.broadcast_order_status_update("order-1", "accepted", order)
+        await asyncio.sleep(0.01)
+
+        binary_event = msgpack.unpackb(packed.sent[1])
+        text_event = json.loads(diffed.sent[1])
+        expected = {"order_id": "order-1", "order_status": "accepted"}
+        return (
+            isinstance(packed.sent[0], str)  # hello stays JSON text
+            and binary_event["data"] == expected
+            and text_event["data"] == expected
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ MessagePack and diff frames carry only the status change")
+            return True
+        print("❌ Compact encodings are incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test compact encodings: {e}")
+        return False
+
+
+def test_notify_chunk_reassembly():
+    """Test that payloads above the NOTIFY limit are chunked and reassembled."""
+    print("\nTesting NOTIFY chunking...")
+
+    async def scenario():
+        from app.services.broadcast_backend import PostgresBroadcastBackend, NOTIFY_CHUNK_SIZE
+
+        class FakeConnection:
+            def __init__(self):
+                self.payloads = []
+
+            async def execute(self, query, channel, payload):
+                self.payloads.append(payload)
+
+            async def executemany(self, query, args):
+                self.payloads.extend(payload for _, payload in args)
+
+            def transaction(self):
+                class Transaction:
+                    async def __aenter__(self):
+                        return self
+
+                    async def __aexit__(self, *exc):
+                        return False
+                return Transaction()
+
+        sender = PostgresBroadcastBackend("postgresql://unused", "order_events")
+        receiver = PostgresBroadcastBackend("postgresql://unused", "order_events")
+        received = []
+        receiver._on_message = received.append
+
+        conn = FakeConnection()
+        message = "x" * (NOTIFY_CHUNK_SIZE * 2 + 10)
+        await sender._notify(conn, message)
+        # Deliver in reverse order to exercise reassembly
+        for payload in reversed(conn.payloads):
+            receiver._handle_notification(conn, 0, "order_events", payload)
+        return (
+            len(conn.payloads) == 3
+            and all(len(payload) < 8000 for payload in conn.payloads)
+            and received == [message]
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Large payloads chunked and reassembled")
+            return True
+        print("❌ NOTIFY chunking is incorrect")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test NOTIFY chunking: {e}")
+        return False
+
+
+def test_broadcast_database_url():
+    """Test that LISTEN uses BROADCAST_DATABASE_URL, with a warning for pgbouncer mode without it."""
+    print("Testing broadcast database URL...")
+
+    try:
+        import logging
+        from app.config import settings
+        from app.services.broadcast_backend import create_broadcast_backend
+
+        warnings = []
+
+        class Capture(logging.Handler):
+            def emit(self, record):
+                warnings.append(record.getMessage())
+
+        handler = Capture(level=logging.WARNING)
+        logging.getLogger("app.services.broadcast_backend").addHandler(handler)
+        saved = settings.BROADCAST_BACKEND, settings.BROADCAST_DATABASE_URL, settings.DB_PGBOUNCER_MODE
+        try:
+            settings.BROADCAST_BACKEND, settings.DB_PGBOUNCER_MODE = "postgres", True
+            settings.BROADCAST_DATABASE_URL = None
+            fallback = create_broadcast_backend().dsn
+            warned = len(warnings)
+            settings.BROADCAST_DATABASE_URL = "postgresql+asyncpg://user:pw@session-pooler:5432/db"
+            dedicated = create_broadcast_backend().dsn
+        finally:
+            settings.BROADCAST_BACKEND, settings.BROADCAST_DATABASE_URL, settings.DB_PGBOUNCER_MODE = saved
+            logging.getLogger("app.services.broadcast_backend").removeHandler(handler)
+
+        expected_fallback = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        if fallback != expected_fallback or dedicated != "postgresql://user:pw@session-pooler:5432/db":
+            print(f"❌ Unexpected LISTEN DSNs: {fallback}, {dedicated}")
+            return False
+        if warned != 1 or len(warnings) != 1:
+            print(f"❌ Expected one pgbouncer warning, got {warnings}")
+            return False
+        print("✅ LISTEN uses BROADCAST_DATABASE_URL; missing URL in pgbouncer mode warns")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test broadcast database URL: {e}")
+        return False
+
+
+def test_order_status_channels():
+    """Test that customers subscribed to an order receive only its status changes."""
+    print("Testing per-order status channels...")
+
+    async def scenario():
+        from app.services.websocket_manager import ConnectionManager
+        from app.services.order_stream import OrderChannels, create_order_token, verify_order_token
+        manager = ConnectionManager(queue_size=10)
+        channels = OrderChannels()
+        manager.add_event_listener(channels.on_event)
+        mine = channels.subscribe("order-1")
+        other = channels.subscribe("order-2")
+
+        await manager.broadcast_payment_status_update("order-1", "paid", table_number=4)
+        await manager.broadcast_order_status_update(
+            "order-1", "accepted", {"id": "order-1", "table_number": 4, "payment_status": "paid", "order_status": "accepted"}
+        )
+        updates = [mine.get_nowait(), mine.get_nowait()]
+        channels.unsubscribe("order-1", mine)
+
+        token = create_order_token("order-1")
+        return (
+            updates == [
+                {"order_id": "order-1", "payment_status": "paid"},
+                {"order_id": "order-1", "payment_status": "paid", "order_status": "accepted"},
+            ]
+            and other.empty()
+            and "order-1" not in channels.channels
+            and verify_order_token("order-1", token)
+            and not verify_order_token("order-2", token)
+        )
+
+    try:
+        if run(scenario()):
+            print("✅ Status changes reached only the order's subscribers")
+            return True
+        print("❌ Unexpected per-order channel behaviour")
+        return False
+    except Exception as e:
+        print(f"❌ Failed to test order channels: {e}")
+        return False
+
+
+def test_background_tasks_and_dispatcher_restart():
+    """Test that close tasks stay referenced until done and a restarted dispatcher keeps queued events."""
+    print("Testing background tasks and dispatcher restart...")
+
+    async def scenario():
+        from app.services.websocket_manager import ConnectionManager, SLOW_CONSUMER_CLOSE_CODE
+        manager = ConnectionManager(queue_size=10)
+        ws = FakeWebSocket()
+        await manager.connect(ws)
+        await asyncio.sleep(0.01)
+
+        # Kill the dispatcher while it still has events to fan out
+        await manager.broadcast_order({"id": "order-1", "table_number": 1})
+        await manager.broadcast_order({"id": "order-2", "table_number": 1})
+        queued = manager._outbox.qsize()
+        manager._dispatcher_task.cancel()
+        await asyncio.sleep(0)
+        await manager.broadcast_order({"id": "order-3", "table_number": 1})
+        await asyncio.sleep(0.01)
+        delivered = len(ws.sent) - 1
+
+        slow = FakeWebSocket()
+        await manager.connect(slow)
+        manager._evict(manager.active_connections[slow])
+        tracked = len(manager._background_tasks)
+        await asyncio.sleep(0.01)
+        return queued, delivered, tracked, len(manager._background_tasks), slow.close_code == SLOW_CONSUMER_CLOSE_CODE
+
+    try:
+        queued, delivered, tracked, remaining, closed = run(scenario())
+        if queued != 2 or delivered != 3:
+            print(f"❌ {queued} events queued at restart, {delivered} of 3 delivered")
+            return False
+        if tracked != 1 or remaining != 0 or not closed:
+            print(f"❌ Close task not tracked ({tracked}) or not released ({remaining})")
+            return False
+        print("✅ Queued events survived the restart; close tasks tracked until done")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to test background tasks: {e}")
+        return False
+
+
+def main():
+    """Run all tests."""
+    print("=" * 60)
+    print("WebSocket Manager Test Suite")
+    print("=" * 60)
+
+    results = [
+        ("Broadcast", test_broadcast_reaches_all_clients()),
+        ("Slow Consumer Eviction", test_slow_consumer_is_evicted()),
+        ("Cross-Instance Fan-Out", test_cross_instance_fan_out()),
+        ("Listener Isolation", test_failing_listener_is_isolated()),
+        ("NOTIFY Chunking", test_notify_chunk_reassembly()),
+        ("Broadcast Database URL", test_broadcast_database_url()),
+        ("Resumable Stream", test_reconnect_replays_gap()),
+        ("Topic Subscriptions", test_topic_subscriptions()),
+        ("Table Range Limit", test_table_range_limit()),
+        ("Event Batching", test_batching_coalesces_status_updates()),
+        ("Heartbeats", test_heartbeat_reaps_idle_connections()),
+        ("Compact Encodings", test_compact_encodings()),
+        ("Order Status Channels", test_order_status_channels()),
+        ("Background Tasks", test_background_tasks_and_dispatcher_restart()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 60)
+    print("Test Summary")
+    print("=" * 60)
+
+    passed = sum(1 for _, result in results if result)
+    total = len(results)
+
+    for test_name, result in results:
+        status = "✅ PASS" if result else "❌ FAIL"
+        print(f"{status}: {test_name}")
+
+    print(f"\nTotal: {passed}/{total} tests passed")
+    return 0 if passed == total else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+-- Migration 001: normalized order_lines table for item-level sales analytics
+-- Run in Supabase SQL Editor, then backfill existing orders with:
+--   cd backend && python -m app.jobs.backfill_order_lines
+
+CREATE TABLE IF NOT EXISTS order_lines (
+    id BIGSERIAL PRIMARY KEY,
+    order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    menu_item_id INTEGER NOT NULL,
+    category_id INTEGER,
+    item_name VARCHAR(200) NOT NULL,
+    unit_price NUMERIC(10, 2) NOT NULL,
+    quantity INTEGER NOT NULL,
+    subtotal NUMERIC(10, 2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_order_lines_order_id ON order_lines(order_id);
+CREATE INDEX IF NOT EXISTS idx_order_lines_created_at ON order_lines(created_at);
+CREATE INDEX IF NOT EXISTS idx_order_lines_menu_item_created_at ON order_lines(menu_item_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_order_lines_category_created_at ON order_lines(category_id, created_at);
+
+COMMENT ON TABLE order_lines IS 'One row per item of an order (normalized copy of orders.items)';
@@ -0,0 +1,13 @@
+-- Migration 002: denormalized table_number on orders
+-- Order reads and broadcasts only need the table number, so it is stored on
+-- the order instead of being joined from tables on every read.
+--
+-- 1. Run this script in Supabase SQL Editor (the column starts nullable).
+-- 2. Deploy the backend, then backfill older orders with:
+--      cd backend && python -m app.jobs.backfill_order_table_numbers
+-- 3. Optionally, once the backfill reports 0 remaining orders:
+--      ALTER TABLE orders ALTER COLUMN table_number SET NOT NULL;
+
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS table_number INTEGER;
+
+COMMENT ON COLUMN orders.table_number IS 'Copy of tables.table_number at order creation';
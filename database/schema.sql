@@ -45,6 +45,7 @@ CREATE INDEX idx_tables_is_active ON tables(is_active);
 CREATE TABLE IF NOT EXISTS orders (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     table_id INTEGER NOT NULL REFERENCES tables(id) ON DELETE RESTRICT,
+    table_number INTEGER NOT NULL, -- copied from tables.table_number at creation
     items JSONB NOT NULL,
     total_amount NUMERIC(10, 2) NOT NULL,
     customer_name VARCHAR(200),
@@ -61,6 +62,24 @@ CREATE INDEX idx_orders_payment_status ON orders(payment_status);
 CREATE INDEX idx_orders_created_at ON orders(created_at DESC);
 CREATE INDEX idx_orders_stripe_session_id ON orders(stripe_session_id);
 
+-- Order lines table (normalized copy of orders.items for analytics)
+CREATE TABLE IF NOT EXISTS order_lines (
+    id BIGSERIAL PRIMARY KEY,
+    order_id UUID NOT NULL REFERENCES orders(id) ON DELETE CASCADE,
+    menu_item_id INTEGER NOT NULL,
+    category_id INTEGER,
+    item_name VARCHAR(200) NOT NULL,
+    unit_price NUMERIC(10, 2) NOT NULL,
+    quantity INTEGER NOT NULL,
+    subtotal NUMERIC(10, 2) NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_order_lines_order_id ON order_lines(order_id);
+CREATE INDEX idx_order_lines_created_at ON order_lines(created_at);
+CREATE INDEX idx_order_lines_menu_item_created_at ON order_lines(menu_item_id, created_at);
+CREATE INDEX idx_order_lines_category_created_at ON order_lines(category_id, created_at);
+
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -81,4 +100,5 @@ COMMENT ON TABLE categories IS 'Menu categories (e.g., Appetizers, Main Courses)
 COMMENT ON TABLE menu_items IS 'Individual menu items with pricing and availability';
 COMMENT ON TABLE tables IS 'Restaurant tables with QR codes';
 COMMENT ON TABLE orders IS 'Customer orders with payment status';
+COMMENT ON TABLE order_lines IS 'One row per item of an order (normalized copy of orders.items)';
 COMMENT ON COLUMN orders.items IS 'JSONB array: [{item_id, name, price, quantity, subtotal}]';
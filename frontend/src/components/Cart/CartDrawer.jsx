@@ -68,7 +68,9 @@ const CartDrawer = ({ isOpen, onClose, tableId }) => {
         toast.success('Order placed successfully!');
         
         // Redirect to order confirmation
-        navigate(`/order-confirmation?order_id=${response.data.order_id}`);
+        navigate(
+          `/order-confirmation?order_id=${response.data.order_id}&token=${encodeURIComponent(response.data.order_token)}`
+        );
       }
     } catch (error) {
       console.error('Order error:', error);
@@ -8,11 +8,22 @@ import toast from 'react-hot-toast';
 import { formatCurrency } from '../utils/formatCurrency';
 import useCartStore from '../hooks/useCart';
 
+// Order statuses after which no more updates are sent
+const FINAL_ORDER_STATUSES = ['rejected', 'completed'];
+
+const ORDER_STATUS_MESSAGES = {
+  pending: 'Waiting for the kitchen to accept your order.',
+  accepted: 'The kitchen is preparing your order.',
+  rejected: 'Sorry, the restaurant could not accept your order. Please ask a member of staff.',
+  completed: 'Your order is ready!',
+};
+
 const OrderConfirmation = () => {
   const [searchParams] = useSearchParams();
   const navigate = useNavigate();
   const sessionId = searchParams.get('session_id');
   const orderId = searchParams.get('order_id');
+  const orderToken = searchParams.get('token');
   const [order, setOrder] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -57,6 +68,27 @@ const OrderConfirmation = () => {
     fetchOrder();
   }, [sessionId, orderId, clearCart]);
 
+  // Live payment and kitchen status for this order (Server-Sent Events)
+  useEffect(() => {
+    if (!orderId || !orderToken) return;
+
+    const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
+    const source = new EventSource(
+      `${apiUrl}/api/orders/${orderId}/events?token=${encodeURIComponent(orderToken)}`
+    );
+
+    source.addEventListener('status', (event) => {
+      const update = JSON.parse(event.data);
+      setOrder((prev) => (prev ? { ...prev, ...update } : prev));
+      // The server ends the stream at a final status; don't let EventSource reconnect
+      if (FINAL_ORDER_STATUSES.includes(update.order_status)) {
+        source.close();
+      }
+    });
+
+    return () => source.close();
+  }, [orderId, orderToken]);
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-gray-50">
@@ -135,7 +167,8 @@ const OrderConfirmation = () => {
           </div>
         )}
         <p className="text-sm text-gray-500 mb-6">
-          Your order will be prepared shortly. Please wait at your table.
+          {ORDER_STATUS_MESSAGES[order?.order_status] ||
+            'Your order will be prepared shortly. Please wait at your table.'}
         </p>
         <button
           onClick={() => {
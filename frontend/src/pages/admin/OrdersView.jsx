@@ -11,6 +11,11 @@ const OrdersView = () => {
   const [loading, setLoading] = useState(true);
   const [isConnected, setIsConnected] = useState(false);
   const wsRef = useRef(null);
+  // Resume position in the server's event stream (see /api/admin/orders/ws)
+  const streamIdRef = useRef(null);
+  const lastSeqRef = useRef(null);
+  // Stream position from a non-resumed hello, adopted once its snapshot is applied
+  const pendingHelloRef = useRef(null);
   const audioContextRef = useRef(null);
   const oscillatorRef = useRef(null);
   const gainNodeRef = useRef(null);
@@ -44,7 +49,10 @@ const OrdersView = () => {
     // Get WebSocket URL from API base URL
     const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000';
     const wsUrl = apiUrl.replace('http://', 'ws://').replace('https://', 'wss://');
-    const wsEndpoint = `${wsUrl}/api/admin/orders/ws?token=${token}`;
+    let wsEndpoint = `${wsUrl}/api/admin/orders/ws?token=${token}`;
+    if (streamIdRef.current && lastSeqRef.current !== null) {
+      wsEndpoint += `&stream_id=${streamIdRef.current}&last_seq=${lastSeqRef.current}`;
+    }
 
     try {
       const ws = new WebSocket(wsEndpoint);
@@ -62,10 +70,37 @@ const OrdersView = () => {
       };
 
       ws.onmessage = (event) => {
+        if (event.data === 'pong') {
+          return;
+        }
         try {
           const message = JSON.parse(event.data);
           
-          if (message.type === 'new_order') {
+          if (message.type === 'ping') {
+            // Server heartbeat: reply so the connection isn't reaped as idle
+            ws.send('pong');
+          } else if (message.type === 'hello') {
+            // A resumed stream advances through its replayed events below
+            if (!message.data.resumed) {
+              const position = { streamId: message.data.stream_id, seq: message.data.seq };
+              if (lastSeqRef.current === null) {
+                // First connection: the list was just loaded, follow live events from here
+                streamIdRef.current = position.streamId;
+                lastSeqRef.current = position.seq;
+              } else {
+                // A snapshot follows; until it arrives a reconnect must still ask for the gap
+                pendingHelloRef.current = position;
+              }
+            }
+          } else if (message.type === 'snapshot') {
+            // Missed events could not be replayed; replace the list
+            setOrders(message.data.orders);
+            if (pendingHelloRef.current) {
+              streamIdRef.current = pendingHelloRef.current.streamId;
+              lastSeqRef.current = pendingHelloRef.current.seq;
+              pendingHelloRef.current = null;
+            }
+          } else if (message.type === 'new_order') {
             const newOrder = message.data;
             
             // Start continuous ringing for new pending orders
@@ -116,6 +151,11 @@ const OrdersView = () => {
               )
             );
           }
+          
+          // Only advance once the event has been applied, and not past a pending snapshot
+          if (message.seq !== undefined && !pendingHelloRef.current) {
+            lastSeqRef.current = message.seq;
+          }
         } catch (error) {
           console.error('Error parsing WebSocket message:', error);
         }